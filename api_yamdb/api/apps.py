@@ -1,6 +1,24 @@
 from django.apps import AppConfig
+from django.core.signals import setting_changed
+from django.db.backends.signals import connection_created
 
 
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .instrumentation import (install_query_metrics,
+                                      install_slow_query_log,
+                                      update_query_metrics)
+        from .statements import (install_statement_stats,
+                                 update_statement_stats)
+        from .versions import install_write_tracking
+
+        connection_created.connect(install_write_tracking)
+        connection_created.connect(install_query_metrics)
+        connection_created.connect(install_slow_query_log)
+        connection_created.connect(install_statement_stats)
+        setting_changed.connect(update_query_metrics)
+        setting_changed.connect(update_statement_stats)
@@ -0,0 +1,227 @@
+import math
+import time
+from collections import namedtuple
+from urllib.parse import urlencode
+
+import numpy as np
+from django.core.cache import cache
+from django.db.models import Count
+from rest_framework.settings import api_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from reviews.models import Comment, Title
+from users.models import CustomUser
+from .instrumentation import collect_metrics, recording_queries
+
+# Рост медианы меньше этого значения считается шумом измерения.
+NOISE_MS = 1.0
+
+Scenario = namedtuple(
+    'Scenario', ('name', 'method', 'path', 'data', 'auth', 'cleanup')
+)
+Scenario.__new__.__defaults__ = (None, False, None)
+Scenario.__doc__ = """
+Запрос к эндпоинту: data — функция номера итерации, возвращающая тело
+запроса, cleanup — функция ответа, откатывающая изменения вне замера.
+"""
+
+
+def prepare_fixture():
+    """
+    Создаёт администратора для авторизованных запросов и выбирает самые
+    нагруженные объекты: произведение с наибольшим числом отзывов
+    и отзыв с наибольшим числом комментариев.
+    """
+    admin, _ = CustomUser.objects.get_or_create(
+        username='benchmark_admin',
+        defaults={
+            'email': 'benchmark_admin@yamdb.fake',
+            'role': CustomUser.ADMIN,
+        },
+    )
+    title = Title.objects.order_by('-reviews_count', 'id').first()
+    hot_review = (
+        Comment.objects.order_by().values('review_id', 'review__title_id')
+        .annotate(comments=Count('id')).order_by('-comments').first()
+    )
+    if title is None or hot_review is None:
+        raise ValueError('Для замеров нужны произведения, отзывы и '
+                         'комментарии.')
+    review = title.reviews.order_by('id').first()
+    comment = Comment.objects.filter(
+        review_id=hot_review['review_id']
+    ).order_by('id').first()
+    return {
+        'admin': admin,
+        'title': title.id,
+        'review': review.id,
+        'last_page': max(
+            1, math.ceil(title.reviews_count / api_settings.PAGE_SIZE)
+        ),
+        'comment_title': hot_review['review__title_id'],
+        'comment_review': hot_review['review_id'],
+        'comment': comment.id,
+        'user': review.author.username,
+    }
+
+
+def delete_created(client):
+    def cleanup(response):
+        if response.status_code == 201:
+            path = response.wsgi_request.path
+            client.delete(f'{path}{response.data["id"]}/')
+    return cleanup
+
+
+def build_scenarios(fixture, client, label=''):
+    titles = '/api/v1/titles/'
+    reviews = f'{titles}{fixture["title"]}/reviews/'
+    comments = (
+        f'{titles}{fixture["comment_title"]}/reviews/'
+        f'{fixture["comment_review"]}/comments/'
+    )
+    admin = fixture['admin']
+    return [
+        Scenario('categories-list', 'get', '/api/v1/categories/'),
+        Scenario('genres-list', 'get', '/api/v1/genres/'),
+        Scenario('titles-list', 'get', titles),
+        Scenario(
+            'titles-filter', 'get',
+            f'{titles}?genre=genre-1&category=category-1&year__gte=2000'
+        ),
+        Scenario(
+            'titles-search', 'get',
+            f'{titles}?{urlencode({"search": "Произведение 1"})}',
+        ),
+        Scenario('title-detail', 'get', f'{titles}{fixture["title"]}/'),
+        Scenario('reviews-list', 'get', reviews),
+        Scenario(
+            'reviews-last-page', 'get',
+            f'{reviews}?page={fixture["last_page"]}',
+        ),
+        Scenario('reviews-cursor', 'get', f'{reviews}?pagination=cursor'),
+        Scenario('review-detail', 'get', f'{reviews}{fixture["review"]}/'),
+        Scenario(
+            'review-create', 'post', reviews,
+            data=lambda i: {'text': 'Замер', 'score': 5},
+            auth=True, cleanup=delete_created(client),
+        ),
+        Scenario('comments-list', 'get', comments),
+        Scenario('comment-detail', 'get', f'{comments}{fixture["comment"]}/'),
+        Scenario('users-list', 'get', '/api/v1/users/', auth=True),
+        Scenario(
+            'user-detail', 'get', f'/api/v1/users/{fixture["user"]}/',
+            auth=True,
+        ),
+        Scenario('users-me', 'get', '/api/v1/users/me/', auth=True),
+        Scenario(
+            'auth-signup', 'post', '/api/v1/auth/signup/',
+            data=lambda i: {
+                'username': f'benchmark{label}_{i}',
+                'email': f'benchmark{label}_{i}@yamdb.fake',
+            },
+        ),
+        Scenario(
+            'auth-token', 'post', '/api/v1/auth/token/',
+            data=lambda i: {
+                'username': admin.username,
+                'confirmation_code': str(admin.confirmation_code),
+            },
+        ),
+    ]
+
+
+def measure(client, scenario, repeat=20, warmup=2, warm_cache=False):
+    """
+    Выполняет сценарий warmup + repeat раз и возвращает сводку по
+    замеренным итерациям: максимум SQL-запросов, медианы времени БД
+    и сериализации, 50-й и 95-й перцентили полного времени запроса в мс.
+    Без warm_cache кэш очищается перед каждым запросом.
+    """
+    samples = []
+    for iteration in range(warmup + repeat):
+        if not warm_cache:
+            cache.clear()
+        data = scenario.data(iteration) if scenario.data else None
+        with collect_metrics() as metrics:
+            started = time.perf_counter()
+            if data is None:
+                response = getattr(client, scenario.method)(scenario.path)
+            else:
+                response = getattr(client, scenario.method)(
+                    scenario.path, data, format='json'
+                )
+            elapsed = time.perf_counter() - started
+        if scenario.cleanup is not None:
+            scenario.cleanup(response)
+        if iteration >= warmup:
+            samples.append((
+                elapsed, metrics.queries, metrics.db_time,
+                metrics.serialize_time, response.status_code,
+            ))
+    elapsed, queries, db_time, serialize_time, statuses = zip(*samples)
+    return {
+        'status': max(set(statuses), key=statuses.count),
+        'queries': max(queries),
+        'db_ms': round(float(np.median(db_time)) * 1000, 3),
+        'serialize_ms': round(float(np.median(serialize_time)) * 1000, 3),
+        'p50_ms': round(float(np.percentile(elapsed, 50)) * 1000, 3),
+        'p95_ms': round(float(np.percentile(elapsed, 95)) * 1000, 3),
+    }
+
+
+def run_benchmark(repeat=20, warmup=2, warm_cache=False, label=''):
+    """
+    Замеряет все сценарии на данных текущей БД. SQL-запросы считаются
+    и при выключенном REQUEST_METRICS.
+    Возвращает словарь {имя сценария: сводка measure}.
+    """
+    fixture = prepare_fixture()
+    anonymous = APIClient()
+    admin = APIClient()
+    admin.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(fixture["admin"])}'
+    )
+    with recording_queries():
+        return {
+            scenario.name: measure(
+                admin if scenario.auth else anonymous,
+                scenario, repeat, warmup, warm_cache,
+            )
+            for scenario in build_scenarios(fixture, admin, label)
+        }
+
+
+def compare(results, baseline, tolerance=0.5, timings=False):
+    """
+    Сравнивает результаты с эталоном по сценариям обоих наборов.
+    Регрессия — больше SQL-запросов, а с timings ещё и медиана времени
+    запроса выше эталонной более чем в 1 + tolerance раз. Время зависит
+    от машины, поэтому сравнивать его имеет смысл только с эталоном,
+    снятым на той же машине. Медиана устойчивее к шуму, чем p95,
+    который на малом числе повторов определяется выбросами.
+    Возвращает список описаний регрессий.
+    """
+    regressions = []
+    for scale, scenarios in results.items():
+        for name, current in scenarios.items():
+            base = baseline.get(scale, {}).get(name)
+            if base is None:
+                continue
+            if current['queries'] > base['queries']:
+                regressions.append(
+                    f'{scale} {name}: SQL-запросов {base["queries"]} -> '
+                    f'{current["queries"]}'
+                )
+            if not timings:
+                continue
+            limit = max(
+                base['p50_ms'] * (1 + tolerance), base['p50_ms'] + NOISE_MS
+            )
+            if current['p50_ms'] > limit:
+                regressions.append(
+                    f'{scale} {name}: p50 {base["p50_ms"]} -> '
+                    f'{current["p50_ms"]} мс'
+                )
+    return regressions
@@ -1,6 +1,29 @@
+import re
+
 import django_filters
+from django.db import connection
+from django.db.models import Count, Q
+
+from reviews.models import Category, Genre, Title
 
-from reviews.models import Title
+SEARCH_TOKEN_RE = re.compile(r'\w+')
+
+MATCH_ANY = 'any'
+MATCH_ALL = 'all'
+MATCH_CHOICES = (
+    (MATCH_ANY, 'Любой из жанров'),
+    (MATCH_ALL, 'Все жанры'),
+)
+
+
+def fulltext_query(value):
+    """
+    Запрос FTS5 из пользовательской строки: каждое слово ищется
+    по префиксу, все слова должны встретиться в произведении.
+    """
+    return ' '.join(
+        f'"{token}"*' for token in SEARCH_TOKEN_RE.findall(value)
+    )
 
 
 class TitleFilter(django_filters.FilterSet):
@@ -14,15 +37,80 @@ class TitleFilter(django_filters.FilterSet):
         field_name='year',
         lookup_expr='exact',
     )
-    genre = django_filters.CharFilter(
-        field_name='genre__slug',
-        lookup_expr='icontains',
-    )
-    category = django_filters.CharFilter(
-        field_name='category__slug',
-        lookup_expr='icontains',
+    genre = django_filters.CharFilter(method='filter_genre')
+    genre_match = django_filters.ChoiceFilter(
+        choices=MATCH_CHOICES,
+        method='skip_filter',
     )
+    category = django_filters.CharFilter(method='filter_category')
+    search = django_filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Title
-        fields = ('name', 'year', 'genre', 'category')
+        fields = (
+            'name', 'year', 'genre', 'genre_match', 'category', 'search'
+        )
+
+    @staticmethod
+    def split_slugs(value):
+        return {slug.strip() for slug in value.split(',') if slug.strip()}
+
+    def skip_filter(self, queryset, name, value):
+        return queryset
+
+    def filter_genre(self, queryset, name, value):
+        """
+        Точный фильтр по слагам жанров через запятую: `?genre=drama,comedy`.
+        По умолчанию подходит любой из жанров, `?genre_match=all` требует
+        все. Слаги один раз переводятся в id, а выборка фильтруется
+        подзапросом к промежуточной таблице, поэтому дублей не бывает.
+        """
+        slugs = self.split_slugs(value)
+        genre_ids = list(
+            Genre.objects.filter(slug__in=slugs).values_list('id', flat=True)
+        )
+        match_all = self.form.cleaned_data.get('genre_match') == MATCH_ALL
+        if not genre_ids or match_all and len(genre_ids) < len(slugs):
+            return queryset.none()
+        links = Title.genre.through.objects.filter(genre_id__in=genre_ids)
+        if match_all:
+            links = links.values('title_id').annotate(
+                genres_count=Count('genre_id')
+            ).filter(genres_count=len(genre_ids))
+        return queryset.filter(id__in=links.values('title_id'))
+
+    def filter_category(self, queryset, name, value):
+        """Точный фильтр по слагам категорий через запятую."""
+        category_ids = list(
+            Category.objects.filter(
+                slug__in=self.split_slugs(value)
+            ).values_list('id', flat=True)
+        )
+        return queryset.filter(category_id__in=category_ids)
+
+    def filter_search(self, queryset, name, value):
+        """
+        Полнотекстовый поиск по названию и описанию произведения.
+        Результаты упорядочены по релевантности, совпадения в названии
+        весят больше совпадений в описании.
+        """
+        query = fulltext_query(value)
+        if not query:
+            return queryset
+        if connection.vendor != 'sqlite':
+            return queryset.filter(
+                Q(name__icontains=value) | Q(description__icontains=value)
+            )
+        # Таблица FTS присоединяется один раз: и отбор, и bm25 берутся
+        # из одного MATCH. Подзапрос bm25 на каждую строку повторял бы
+        # полнотекстовый поиск для каждого найденного произведения.
+        return queryset.extra(
+            tables=['reviews_title_fts'],
+            where=[
+                'reviews_title_fts.rowid = reviews_title.id',
+                'reviews_title_fts MATCH %s',
+            ],
+            params=[query],
+            select={'search_rank': 'bm25(reviews_title_fts, 10.0, 1.0)'},
+            order_by=['search_rank', 'reviews_title.id'],
+        )
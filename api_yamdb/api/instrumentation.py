@@ -0,0 +1,425 @@
+import json
+import logging
+import os
+import re
+import sys
+import sysconfig
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework.serializers import Serializer
+
+logger = logging.getLogger('api.metrics')
+nplusone_logger = logging.getLogger('api.nplusone')
+slow_query_logger = logging.getLogger('api.slow_queries')
+
+current_metrics = ContextVar('current_metrics', default=None)
+
+FINGERPRINT_SUBSTITUTIONS = (
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'%s'), '?'),
+    (re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)'), '(...)'),
+    (re.compile(r'\s+'), ' '),
+)
+
+# Файлы, строки которых не считаются источником запроса.
+LIBRARY_PATHS = tuple({
+    sysconfig.get_paths()[name] for name in ('stdlib', 'purelib', 'platlib')
+}) + (__file__,)
+# Запросы, для которых запрашивается план выполнения.
+EXPLAINABLE_RE = re.compile(
+    r'^\s*(?:SELECT|INSERT|UPDATE|DELETE|WITH)\b', re.IGNORECASE
+)
+# Аргументы обёрток выполнения запросов (connection.execute_wrapper).
+WRAPPER_ARGUMENTS = ('execute', 'sql', 'params', 'many', 'context')
+
+
+class NPlusOneError(Exception):
+    """Однотипные SQL-запросы, повторяющиеся за один запрос к API."""
+
+
+@lru_cache(maxsize=1024)
+def fingerprint_sql(sql):
+    """
+    Форма SQL-запроса: литералы и параметры заменены на `?`,
+    списки параметров IN — на `(...)`, пробелы схлопнуты.
+    Запросы, отличающиеся только значениями, дают одну форму.
+    """
+    for pattern, replacement in FINGERPRINT_SUBSTITUTIONS:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+def query_source():
+    """
+    Откуда выполнен запрос: поле сериализатора, представляющего объект,
+    если запрос выполнен при сериализации, и ближайшая строка кода
+    проекта (не библиотек и не обёрток выполнения запросов)
+    в стеке вызовов.
+    """
+    field = location = None
+    frame = sys._getframe(1)
+    while frame is not None and (field is None or location is None):
+        code = frame.f_code
+        if location is None and not code.co_filename.startswith(
+            LIBRARY_PATHS
+        ) and code.co_varnames[:5] != WRAPPER_ARGUMENTS:
+            location = (
+                f'{os.path.relpath(code.co_filename, settings.BASE_DIR)}:'
+                f'{frame.f_lineno} in {code.co_name}'
+            )
+        if field is None and code.co_name == 'to_representation':
+            serializer = frame.f_locals.get('self')
+            if isinstance(serializer, Serializer) and (
+                'field' in frame.f_locals
+            ):
+                field = (
+                    f'{type(serializer).__name__}.'
+                    f'{frame.f_locals["field"].field_name}'
+                )
+        frame = frame.f_back
+    return ', '.join(source for source in (field, location) if source)
+
+
+class RequestMetrics:
+    """Счётчики одного запроса: SQL-запросы, сериализация и время view."""
+
+    def __init__(self, timing=True):
+        # Замерять ли время сериализации; поиску N+1 оно не нужно.
+        self.timing = timing
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self.serialize_depth = 0
+        self.view_started = None
+        self.view = None
+        # {форма запроса: [число выполнений, источник]} при поиске N+1.
+        self.fingerprints = None
+
+    def record_fingerprint(self, sql):
+        fingerprint = fingerprint_sql(sql)
+        entry = self.fingerprints.setdefault(fingerprint, [0, None])
+        entry[0] += 1
+        if entry[0] == 2:
+            entry[1] = query_source()
+
+    def repeated_queries(self, threshold=None):
+        """
+        Формы запросов, выполненных не меньше threshold раз,
+        по умолчанию — NPLUSONE_THRESHOLD.
+        """
+        if threshold is None:
+            threshold = nplusone_threshold()
+        return [
+            {'fingerprint': fingerprint, 'count': count, 'source': source}
+            for fingerprint, (count, source) in (
+                self.fingerprints or {}
+            ).items()
+            if count >= threshold
+        ]
+
+
+def nplusone_threshold():
+    """Сколько однотипных запросов за один запрос к API считать N+1."""
+    return getattr(settings, 'NPLUSONE_THRESHOLD', 3)
+
+
+def describe_repeated(repeated):
+    return '\n'.join(
+        f'{item["count"]} раз: {item["source"]}: {item["fingerprint"]}'
+        for item in repeated
+    )
+
+
+@contextmanager
+def collect_metrics(detect=False, timing=True):
+    """
+    Включает сбор счётчиков в текущем контексте, с detect — и форм
+    SQL-запросов для поиска N+1, с timing — и времени сериализации.
+    Если сбор уже включён снаружи, например замером
+    производительности, счётчики общие.
+    SQL-запросы считаются только на соединениях с обёрткой
+    record_queries, см. install_query_metrics и recording_queries.
+    """
+    metrics = current_metrics.get()
+    if metrics is not None:
+        if detect and metrics.fingerprints is None:
+            metrics.fingerprints = {}
+        metrics.timing = metrics.timing or timing
+        yield metrics
+        return
+    metrics = RequestMetrics(timing)
+    if detect:
+        metrics.fingerprints = {}
+    token = current_metrics.set(metrics)
+    try:
+        yield metrics
+    finally:
+        current_metrics.reset(token)
+
+
+def record_queries(execute, sql, params, many, context):
+    """
+    Обёртка выполнения запросов, считающая их число и время.
+    Без включённого сбора только проверяет переменную контекста.
+    """
+    metrics = current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.db_time += time.perf_counter() - started
+        if metrics.fingerprints is not None:
+            metrics.record_fingerprint(sql)
+
+
+@contextmanager
+def assert_no_n_plus_one(threshold=None):
+    """
+    Падает с NPlusOneError, если внутри блока однотипный запрос
+    выполнен threshold раз (по умолчанию NPLUSONE_THRESHOLD) или больше.
+    Для тестов.
+    """
+    with recording_queries(), collect_metrics(detect=True) as metrics:
+        yield metrics
+    repeated = metrics.repeated_queries(threshold)
+    if repeated:
+        raise NPlusOneError(describe_repeated(repeated))
+
+
+def query_metrics_enabled():
+    return bool(
+        getattr(settings, 'REQUEST_METRICS', False)
+        or getattr(settings, 'NPLUSONE_DETECTION', None)
+    )
+
+
+def install_query_metrics(sender, connection, **kwargs):
+    """
+    Подключает record_queries к новому соединению, только если
+    включены REQUEST_METRICS или NPLUSONE_DETECTION.
+    """
+    if not query_metrics_enabled():
+        return
+    if record_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_queries)
+
+
+def update_query_metrics(setting, **kwargs):
+    """
+    Подключает или отключает record_queries на открытых соединениях
+    при изменении настроек, например фикстурой settings в тестах.
+    """
+    if setting not in ('REQUEST_METRICS', 'NPLUSONE_DETECTION'):
+        return
+    enabled = query_metrics_enabled()
+    for connection in connections.all():
+        if enabled:
+            install_query_metrics(None, connection)
+        elif record_queries in connection.execute_wrappers:
+            connection.execute_wrappers.remove(record_queries)
+
+
+@contextmanager
+def recording_queries():
+    """
+    Временно подключает record_queries ко всем соединениям, где её нет,
+    независимо от настроек. Для замеров и тестов.
+    """
+    added = []
+    for connection in connections.all():
+        if record_queries not in connection.execute_wrappers:
+            connection.execute_wrappers.append(record_queries)
+            added.append(connection)
+    try:
+        yield
+    finally:
+        for connection in added:
+            connection.execute_wrappers.remove(record_queries)
+
+
+def explain_query(connection, sql, params):
+    """
+    План выполнения запроса (EXPLAIN QUERY PLAN в SQLite) строками.
+    Курсор create_cursor минует обёртки выполнения запросов, поэтому
+    EXPLAIN не попадает в счётчики и сам не записывается в журнал.
+    """
+    cursor = connection.create_cursor()
+    try:
+        cursor.execute(
+            f'{connection.ops.explain_query_prefix()} {sql}', params
+        )
+        return [str(row[-1]) for row in cursor.fetchall()]
+    except connection.Database.Error as error:
+        return [f'{type(error).__name__}: {error}']
+    finally:
+        cursor.close()
+
+
+def log_slow_query(connection, sql, params, many, elapsed):
+    """
+    Пишет запрос в журнал api.slow_queries. Без SLOW_QUERY_LOG_PARAMS
+    вместо SQL пишется его форма, а вместо параметров — их число;
+    для executemany param_count — число наборов параметров.
+    """
+    metrics = current_metrics.get()
+    with_params = getattr(settings, 'SLOW_QUERY_LOG_PARAMS', False)
+    slow_query_logger.warning(json.dumps({
+        'time_ms': round(elapsed * 1000, 3),
+        'view': metrics.view if metrics else None,
+        'source': query_source(),
+        'sql': sql if with_params else fingerprint_sql(sql),
+        'many': many,
+        'param_count': len(params) if params is not None else 0,
+        'params': params if with_params else None,
+        'plan': explain_query(connection, sql, params) if (
+            not many and EXPLAINABLE_RE.match(sql)
+        ) else None,
+    }, ensure_ascii=False, default=str))
+
+
+def log_slow_queries(execute, sql, params, many, context):
+    """
+    Обёртка выполнения запросов, записывающая в журнал api.slow_queries
+    запросы дольше SLOW_QUERY_THRESHOLD_MS: SQL или его форму, view,
+    источник в коде и план выполнения, см. log_slow_query.
+    """
+    threshold = getattr(settings, 'SLOW_QUERY_THRESHOLD_MS', None)
+    if threshold is None:
+        return execute(sql, params, many, context)
+    if many and not isinstance(params, (list, tuple)):
+        # Наборы параметров executemany могут прийти итератором.
+        params = list(params)
+    started = time.perf_counter()
+    result = execute(sql, params, many, context)
+    elapsed = time.perf_counter() - started
+    if elapsed * 1000 >= threshold:
+        log_slow_query(context['connection'], sql, params, many, elapsed)
+    return result
+
+
+def install_slow_query_log(sender, connection, **kwargs):
+    if getattr(settings, 'SLOW_QUERY_THRESHOLD_MS', None) is None:
+        return
+    if log_slow_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(log_slow_queries)
+
+
+class TimedRepresentationMixin:
+    """
+    Замеряет время представления объектов сериализатором, если сбор
+    счётчиков включён с timing. Время вложенных сериализаторов входит
+    во время внешнего.
+    """
+
+    def to_representation(self, instance):
+        metrics = current_metrics.get()
+        if metrics is None or not metrics.timing or metrics.serialize_depth:
+            return super().to_representation(instance)
+        metrics.serialize_depth += 1
+        started = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            metrics.serialize_depth -= 1
+            metrics.serialize_time += time.perf_counter() - started
+
+
+def is_admin(user):
+    return user is not None and user.is_authenticated and (
+        user.is_admin or user.is_superuser
+    )
+
+
+class ServerTimingMiddleware:
+    """
+    Собирает счётчики каждого запроса и пишет их строкой JSON в лог
+    `api.metrics`. Администраторам, а при SERVER_TIMING_PUBLIC всем,
+    отдаёт их в заголовке Server-Timing.
+
+    При NPLUSONE_DETECTION = 'log' или 'raise' ищет однотипные запросы,
+    повторённые NPLUSONE_THRESHOLD раз, и пишет их с источником в лог
+    `api.nplusone` или выбрасывает NPlusOneError, чтобы упал тест.
+    Имя view запроса попадает в журнал медленных запросов.
+    Если всё это выключено, Django не подключает middleware.
+    """
+
+    def __init__(self, get_response):
+        if not any((
+            getattr(settings, 'REQUEST_METRICS', False),
+            getattr(settings, 'NPLUSONE_DETECTION', None),
+            getattr(settings, 'SLOW_QUERY_THRESHOLD_MS', None) is not None,
+        )):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        detection = getattr(settings, 'NPLUSONE_DETECTION', None)
+        enabled = getattr(settings, 'REQUEST_METRICS', False)
+        started = time.perf_counter()
+        with collect_metrics(
+            detect=bool(detection), timing=enabled
+        ) as metrics:
+            response = self.get_response(request)
+        finished = time.perf_counter()
+        if enabled:
+            self.report_metrics(request, response, metrics, {
+                'db': metrics.db_time,
+                'serialize': metrics.serialize_time,
+                'view': finished - (metrics.view_started or started),
+                'total': finished - started,
+            })
+        if detection:
+            self.report_repeated(request, metrics, detection)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = current_metrics.get()
+        if metrics is not None:
+            metrics.view_started = time.perf_counter()
+            metrics.view = request.resolver_match.view_name
+
+    def report_metrics(self, request, response, metrics, timings):
+        match = request.resolver_match
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'queries': metrics.queries,
+            **{
+                f'{name}_ms': round(value * 1000, 3)
+                for name, value in timings.items()
+            },
+        }, ensure_ascii=False))
+        if getattr(settings, 'SERVER_TIMING_PUBLIC', False) or is_admin(
+            getattr(request, 'user', None)
+        ):
+            response['Server-Timing'] = ', '.join(
+                f'{name};dur={value * 1000:.3f}' + (
+                    f';desc="{metrics.queries} queries"'
+                    if name == 'db' else ''
+                )
+                for name, value in timings.items()
+            )
+
+    def report_repeated(self, request, metrics, detection):
+        repeated = metrics.repeated_queries()
+        if not repeated:
+            return
+        message = (
+            f'N+1 в {request.method} {request.path}:\n'
+            f'{describe_repeated(repeated)}'
+        )
+        if detection == 'raise':
+            raise NPlusOneError(message)
+        nplusone_logger.warning(message)
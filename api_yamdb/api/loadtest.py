@@ -0,0 +1,402 @@
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+
+import numpy as np
+from django.conf import settings
+from django.db import connection, connections
+from rest_framework_simplejwt.tokens import AccessToken
+
+from reviews.models import Category, Genre, Review, Title
+from reviews.ratings import rebuild_ratings
+from reviews.synthetic import (dataset_sizes, generate_dataset,
+                               write_database)
+from users.models import CustomUser
+
+DEFAULT_MIX = 'browse=50,reviews=15,comments=25,signup=5,post_review=5'
+REQUEST_TIMEOUT = 30
+SAMPLE_SIZE = 1000
+# Сценарии, которые читают БД сервера напрямую и поэтому работают
+# только с сервером, запущенным командой на той же БД.
+LOCAL_SCENARIOS = ('signup',)
+# Заголовок, в котором сервер load_test сообщает исключение ответа 5xx.
+SERVER_ERROR_HEADER = 'X-Server-Error'
+LOCKED_ERROR = 'OperationalError: database is locked'
+
+
+def parse_mix(value, local=True):
+    """
+    Разбирает смесь сценариев вида `browse=50,signup=5` в словарь весов.
+    Без local сценарии LOCAL_SCENARIOS недоступны.
+    """
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        if name not in SCENARIOS:
+            raise ValueError(
+                f'Неизвестный сценарий {name}. '
+                f'Доступны: {", ".join(SCENARIOS)}'
+            )
+        if not local and name in LOCAL_SCENARIOS:
+            raise ValueError(
+                f'Сценарий {name} читает код подтверждения из БД и '
+                'работает только с сервером, запущенным командой.'
+            )
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def default_mix(local=True):
+    """Смесь сценариев по умолчанию, без local — без LOCAL_SCENARIOS."""
+    if local:
+        return DEFAULT_MIX
+    return ','.join(
+        part for part in DEFAULT_MIX.split(',')
+        if part.partition('=')[0] not in LOCAL_SCENARIOS
+    )
+
+
+def sample(queryset, *fields):
+    """Случайная выборка значений из таблицы для параметров запросов."""
+    return list(queryset.order_by('?').values_list(*fields)[:SAMPLE_SIZE])
+
+
+def load_fixture(users=20):
+    """
+    Готовит данные для сценариев: выборки произведений, отзывов, slug
+    жанров и категорий и токены пользователей, от имени которых
+    публикуются отзывы.
+    """
+    clients = list(CustomUser.objects.order_by('?')[:users])
+    fixture = {
+        'titles': [pk for pk, in sample(Title.objects, 'id')],
+        'reviews': sample(Review.objects, 'title_id', 'id'),
+        'genres': [slug for slug, in sample(Genre.objects, 'slug')],
+        'categories': [slug for slug, in sample(Category.objects, 'slug')],
+        'tokens': [str(AccessToken.for_user(user)) for user in clients],
+    }
+    if not fixture['titles'] or not fixture['reviews'] or not clients:
+        raise ValueError('Для нагрузочного теста нужны произведения, '
+                         'отзывы и пользователи.')
+    return fixture
+
+
+class Worker:
+    """Виртуальный клиент: выполняет сценарии и копит замеры по эндпоинтам."""
+
+    def __init__(self, base_url, fixture, rng):
+        self.base_url = base_url.rstrip('/') + '/api/v1'
+        self.fixture = fixture
+        self.rng = rng
+        self.token = rng.choice(fixture['tokens'])
+        self.samples = defaultdict(list)
+
+    def request(self, endpoint, method, path, data=None, token=None):
+        """
+        Выполняет запрос и записывает тройку (секунды, статус, ошибка).
+        Ошибкой считаются ответы 5xx и сбои соединения. Для 5xx сервера,
+        запущенного командой, ошибка — исключение из SERVER_ERROR_HEADER,
+        например блокировка SQLite, иначе только код ответа.
+        Возвращает разобранный JSON ответа или None.
+        """
+        headers = {'Content-Type': 'application/json'}
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+        body = json.dumps(data).encode() if data is not None else None
+        request = Request(
+            self.base_url + path, body, headers, method=method
+        )
+        error = None
+        payload = None
+        started = time.perf_counter()
+        try:
+            with urlopen(request, timeout=REQUEST_TIMEOUT) as response:
+                status = response.status
+                payload = response.read()
+        except HTTPError as http_error:
+            status = http_error.code
+            http_error.read()
+            if status >= 500:
+                error = http_error.headers.get(
+                    SERVER_ERROR_HEADER, f'HTTP {status}'
+                )
+        except (URLError, socket.timeout, ConnectionError) as exc:
+            status = 0
+            error = type(getattr(exc, 'reason', exc)).__name__
+        elapsed = time.perf_counter() - started
+        self.samples[endpoint].append((elapsed, status, error))
+        if payload:
+            try:
+                return json.loads(payload)
+            except ValueError:
+                return None
+        return None
+
+    def browse(self):
+        """Список произведений с фильтрами и страница произведения."""
+        params = {}
+        if self.rng.random() < 0.5 and self.fixture['genres']:
+            params['genre'] = self.rng.choice(self.fixture['genres'])
+        if self.rng.random() < 0.3 and self.fixture['categories']:
+            params['category'] = self.rng.choice(self.fixture['categories'])
+        if self.rng.random() < 0.3:
+            params['year'] = self.rng.randint(1950, 2024)
+        if self.rng.random() < 0.3:
+            params['page'] = self.rng.randint(1, 5)
+        self.request('titles-list', 'GET', f'/titles/?{urlencode(params)}')
+        title_id = self.rng.choice(self.fixture['titles'])
+        self.request('title-detail', 'GET', f'/titles/{title_id}/')
+
+    def reviews(self):
+        title_id = self.rng.choice(self.fixture['titles'])
+        self.request('reviews-list', 'GET', f'/titles/{title_id}/reviews/')
+
+    def comments(self):
+        """Листает комментарии отзыва по ссылкам next, до трёх страниц."""
+        title_id, review_id = self.rng.choice(self.fixture['reviews'])
+        path = f'/titles/{title_id}/reviews/{review_id}/comments/'
+        for _ in range(3):
+            page = self.request('comments-list', 'GET', path)
+            if not page or not page.get('next'):
+                return
+            path = page['next'].split('/api/v1', 1)[1]
+
+    def signup(self):
+        """
+        Регистрация и получение токена по коду из БД. Код читается
+        через ORM этого процесса, поэтому сценарий корректен только
+        для сервера на той же БД.
+        """
+        name = f'load_{self.rng.getrandbits(48):x}'
+        self.request('auth-signup', 'POST', '/auth/signup/', {
+            'username': name, 'email': f'{name}@yamdb.fake',
+        })
+        code = CustomUser.objects.filter(username=name).values_list(
+            'confirmation_code', flat=True
+        ).first()
+        if code is not None:
+            self.request('auth-token', 'POST', '/auth/token/', {
+                'username': name, 'confirmation_code': str(code),
+            })
+
+    def post_review(self):
+        title_id = self.rng.choice(self.fixture['titles'])
+        self.request(
+            'review-create', 'POST', f'/titles/{title_id}/reviews/',
+            {'text': 'Нагрузочный тест', 'score': self.rng.randint(1, 10)},
+            token=self.token,
+        )
+
+
+SCENARIOS = {
+    'browse': Worker.browse,
+    'reviews': Worker.reviews,
+    'comments': Worker.comments,
+    'signup': Worker.signup,
+    'post_review': Worker.post_review,
+}
+
+
+def run_worker(base_url, fixture, mix, deadline, seed):
+    worker = Worker(base_url, fixture, random.Random(seed))
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    try:
+        while time.monotonic() < deadline:
+            name = worker.rng.choices(names, weights)[0]
+            SCENARIOS[name](worker)
+    finally:
+        connections.close_all()
+    return worker.samples
+
+
+def summarize(samples, duration):
+    """
+    Сводка по эндпоинту: запросы, пропускная способность, ответы 4xx,
+    ошибки по видам и перцентили времени ответа в мс.
+    """
+    elapsed, statuses, errors = zip(*samples)
+    elapsed = np.array(elapsed) * 1000
+    statuses = np.array(statuses)
+    error_kinds = defaultdict(int)
+    for error in errors:
+        if error:
+            error_kinds[error] += 1
+    return {
+        'requests': len(samples),
+        'rps': round(len(samples) / duration, 2),
+        'client_errors': int(((statuses >= 400) & (statuses < 500)).sum()),
+        'errors': dict(error_kinds),
+        'error_rate': round(sum(error_kinds.values()) / len(samples), 4),
+        'p50_ms': round(float(np.percentile(elapsed, 50)), 2),
+        'p95_ms': round(float(np.percentile(elapsed, 95)), 2),
+        'p99_ms': round(float(np.percentile(elapsed, 99)), 2),
+    }
+
+
+def run_load(base_url, mix, threads=16, duration=30, seed=0):
+    """
+    Запускает threads виртуальных клиентов на duration секунд.
+    Возвращает словарь {эндпоинт: сводка} и общую сводку под ключом '*'.
+    """
+    fixture = load_fixture()
+    deadline = time.monotonic() + duration
+    started = time.perf_counter()
+    with ThreadPoolExecutor(threads) as executor:
+        futures = [
+            executor.submit(
+                run_worker, base_url, fixture, mix, deadline, seed + number
+            )
+            for number in range(threads)
+        ]
+        results = [future.result() for future in futures]
+    elapsed = time.perf_counter() - started
+    merged = defaultdict(list)
+    for samples in results:
+        for endpoint, values in samples.items():
+            merged[endpoint].extend(values)
+    report = {
+        endpoint: summarize(values, elapsed)
+        for endpoint, values in sorted(merged.items())
+    }
+    everything = [value for values in merged.values() for value in values]
+    if everything:
+        report['*'] = summarize(everything, elapsed)
+    return report
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class ServerErrorMiddleware:
+    """
+    Промежуточный слой сервера load_test: пишет в заголовок
+    SERVER_ERROR_HEADER ответа 5xx тип и текст исключения, чтобы
+    клиенты считали ошибки по видам, например блокировки SQLite.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        error = getattr(request, 'server_error', None)
+        if error and response.status_code >= 500:
+            response[SERVER_ERROR_HEADER] = error
+        return response
+
+    def process_exception(self, request, exception):
+        error = f'{type(exception).__name__}: {exception}'.splitlines()[0]
+        request.server_error = error[:200].encode(
+            'ascii', 'backslashreplace'
+        ).decode()
+
+
+def count_locked(log):
+    """Число исключений «database is locked» в журнале сервера."""
+    return sum(
+        line.startswith(f'django.db.utils.{LOCKED_ERROR}')
+        for line in log.splitlines()
+    )
+
+
+@contextmanager
+def temporary_database(reviews, seed, directory):
+    """
+    Создаёт в directory временную БД с синтетическим набором из reviews
+    отзывов, как benchmark_api, и переключает на неё соединение.
+    Возвращает имя БД для сервера; после выхода БД удаляется.
+    """
+    test_settings = connection.settings_dict['TEST']
+    test_name = test_settings.get('NAME')
+    if connection.vendor == 'sqlite':
+        test_settings['NAME'] = os.path.join(directory, 'load_test.sqlite3')
+    try:
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            write_database(generate_dataset(
+                **dataset_sizes(reviews), seed=seed
+            ))
+            rebuild_ratings()
+            yield connection.settings_dict['NAME']
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+    finally:
+        test_settings['NAME'] = test_name
+
+
+class LocalServer:
+    """
+    Сервер разработки Django в отдельном процессе на свободном порту.
+    Работает с той же БД, что и команда; обрабатывает запросы в потоках.
+    Запускается с настройками api_yamdb.load_test_settings, в которых
+    отладочные проверки вроде поиска N+1 выключены; env дополняет
+    переменные окружения процесса. Вывод сервера после остановки
+    доступен в атрибуте log.
+    """
+
+    def __init__(self, env=None, startup_timeout=30):
+        self.port = free_port()
+        self.url = f'http://127.0.0.1:{self.port}'
+        self.env = env or {}
+        self.startup_timeout = startup_timeout
+        self.process = None
+        self.output = None
+        self.log = ''
+
+    def __enter__(self):
+        self.output = tempfile.TemporaryFile(
+            'w+', encoding='utf-8', errors='replace'
+        )
+        self.process = subprocess.Popen(
+            [
+                sys.executable, str(settings.BASE_DIR / 'manage.py'),
+                'runserver', '--noreload', f'127.0.0.1:{self.port}',
+            ],
+            stdout=self.output,
+            stderr=subprocess.STDOUT,
+            env={
+                **os.environ,
+                'DJANGO_SETTINGS_MODULE': 'api_yamdb.load_test_settings',
+                'PYTHONUNBUFFERED': '1',
+                **self.env,
+            },
+        )
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError('Сервер завершился при запуске.')
+            try:
+                with socket.create_connection(('127.0.0.1', self.port), 1):
+                    return self
+            except OSError:
+                time.sleep(0.2)
+        self.__exit__()
+        raise RuntimeError('Сервер не запустился за отведённое время.')
+
+    def __exit__(self, *exc_info):
+        self.process.terminate()
+        try:
+            self.process.wait(10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        self.output.seek(0)
+        self.log = self.output.read()
+        self.output.close()
@@ -0,0 +1,143 @@
+import json
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (override_settings, setup_test_environment,
+                               teardown_test_environment)
+
+from api.benchmark import compare, run_benchmark
+from reviews.ratings import rebuild_ratings
+from reviews.synthetic import (dataset_sizes, generate_dataset,
+                               write_database)
+
+BENCHMARKS_DIR = settings.BASE_DIR / 'benchmarks'
+
+
+class Command(BaseCommand):
+    help = ('benchmarking API endpoints in-process on temporary databases '
+            'filled with synthetic data of several sizes')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scales',
+            default='1000,100000,1000000',
+            help='comma separated numbers of reviews, one temporary '
+                 'database per number',
+        )
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument(
+            '--warm-cache',
+            action='store_true',
+            help='keep response and count caches between requests',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--output',
+            default=BENCHMARKS_DIR / 'latest.json',
+            help='file for the results',
+        )
+        parser.add_argument(
+            '--baseline',
+            default=BENCHMARKS_DIR / 'baseline.json',
+            help='results file to compare with, the committed baseline by '
+                 'default; regressions fail the command, an empty value '
+                 'skips the comparison',
+        )
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=0.5,
+            help='allowed relative p50 growth over the baseline with '
+                 '--compare-timings',
+        )
+        parser.add_argument(
+            '--compare-timings',
+            action='store_true',
+            help='also fail on p50 growth over the baseline; only '
+                 'meaningful for a baseline recorded on this machine, '
+                 'by default only SQL query counts are compared',
+        )
+
+    def run_scale(self, reviews, options, tmp_dir):
+        """Создаёт временную БД, заполняет её и замеряет эндпоинты."""
+        test_settings = connection.settings_dict['TEST']
+        test_name = test_settings.get('NAME')
+        if connection.vendor == 'sqlite':
+            test_settings['NAME'] = os.path.join(
+                tmp_dir, f'benchmark_{reviews}.sqlite3'
+            )
+        try:
+            old_name = connection.creation.create_test_db(
+                verbosity=0, autoclobber=True, serialize=False
+            )
+            try:
+                cache.clear()
+                write_database(generate_dataset(
+                    **dataset_sizes(reviews), seed=options['seed']
+                ))
+                rebuild_ratings()
+                return run_benchmark(
+                    options['repeat'], options['warmup'],
+                    options['warm_cache'], label=reviews,
+                )
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+        finally:
+            test_settings['NAME'] = test_name
+
+    def report(self, scale, results):
+        self.stdout.write(f'Отзывов: {scale}')
+        for name, stats in results.items():
+            self.stdout.write(
+                f'  {name:<18} {stats["status"]} '
+                f'запросов {stats["queries"]:>3}  '
+                f'БД {stats["db_ms"]:>8.2f} мс  '
+                f'сериализация {stats["serialize_ms"]:>8.2f} мс  '
+                f'p50 {stats["p50_ms"]:>8.2f} мс  '
+                f'p95 {stats["p95_ms"]:>8.2f} мс'
+            )
+
+    def handle(self, *args, **options):
+        scales = [int(scale) for scale in options['scales'].split(',')]
+        results = {}
+        setup_test_environment()
+        try:
+            # Поиск N+1 делит счётчики запросов с замерами и сам стоит
+            # времени, поэтому на время замеров выключается.
+            with override_settings(NPLUSONE_DETECTION=None):
+                with tempfile.TemporaryDirectory() as tmp_dir:
+                    for scale in scales:
+                        results[str(scale)] = self.run_scale(
+                            scale, options, tmp_dir
+                        )
+                        self.report(scale, results[str(scale)])
+        finally:
+            teardown_test_environment()
+        os.makedirs(os.path.dirname(options['output']) or '.', exist_ok=True)
+        with open(options['output'], 'w', encoding='utf-8') as file:
+            json.dump(results, file, ensure_ascii=False, indent=2)
+            file.write('\n')
+        self.stdout.write(f'Результаты записаны в {options["output"]}')
+        if not options['baseline']:
+            return
+        if not os.path.exists(options['baseline']):
+            self.stdout.write(self.style.WARNING(
+                f'Эталон {options["baseline"]} не найден, сравнение пропущено'
+            ))
+            return
+        with open(options['baseline'], encoding='utf-8') as file:
+            baseline = json.load(file)
+        regressions = compare(
+            results, baseline, options['tolerance'],
+            options['compare_timings'],
+        )
+        if regressions:
+            raise CommandError(
+                'Регрессии относительно эталона:\n' + '\n'.join(regressions)
+            )
+        self.stdout.write(self.style.SUCCESS('Регрессий не найдено'))
@@ -0,0 +1,112 @@
+import json
+import os
+import tempfile
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.loadtest import (LocalServer, count_locked, default_mix, parse_mix,
+                          run_load, temporary_database)
+
+
+class Command(BaseCommand):
+    help = ('load testing the API with concurrent clients against a local '
+            'development server or a given url')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url',
+            help='base url of a running server; by default a development '
+                 'server is started on a free port',
+        )
+        parser.add_argument(
+            '--temp-db',
+            type=int,
+            metavar='REVIEWS',
+            help='run the started server on a temporary database with this '
+                 'many synthetic reviews and a temporary mail directory, '
+                 'removed afterwards; without it the server uses the '
+                 'project database and writes mail to sent_emails',
+        )
+        parser.add_argument(
+            '--mix',
+            help='scenario weights: browse, reviews, comments, signup, '
+                 'post_review; signup reads confirmation codes from the '
+                 'database and needs the started server, so it is left out '
+                 'of the default mix with --url',
+        )
+        parser.add_argument('--threads', type=int, default=16)
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=30,
+            help='seconds of load',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help='file for the JSON report')
+        parser.add_argument(
+            '--server-log',
+            help='file to save the output of the started server to',
+        )
+
+    def run(self, url, mix, options):
+        return run_load(
+            url, mix, options['threads'], options['duration'],
+            options['seed'],
+        )
+
+    def serve(self, mix, options, env):
+        """
+        Запускает сервер и нагрузку; число блокировок БД по журналу
+        сервера добавляет в общую сводку.
+        """
+        with LocalServer(env) as server:
+            report = self.run(server.url, mix, options)
+        if options['server_log']:
+            with open(options['server_log'], 'w', encoding='utf-8') as file:
+                file.write(server.log)
+        if '*' in report:
+            report['*']['locked_in_server_log'] = count_locked(server.log)
+        return report
+
+    def start_and_run(self, mix, options):
+        if options['temp_db'] is None:
+            return self.serve(mix, options, {})
+        with tempfile.TemporaryDirectory(prefix='load_test_') as tmp_dir:
+            with temporary_database(
+                options['temp_db'], options['seed'], tmp_dir
+            ) as name:
+                return self.serve(mix, options, {
+                    'LOAD_TEST_DATABASE': str(name),
+                    'LOAD_TEST_EMAIL_DIR': os.path.join(tmp_dir, 'emails'),
+                })
+
+    def handle(self, *args, **options):
+        if options['url'] and options['temp_db'] is not None:
+            raise CommandError('--temp-db работает только без --url.')
+        try:
+            local = not options['url']
+            mix = parse_mix(options['mix'] or default_mix(local), local)
+            if options['url']:
+                report = self.run(options['url'], mix, options)
+            else:
+                report = self.start_and_run(mix, options)
+        except (ValueError, RuntimeError) as error:
+            raise CommandError(error)
+        for endpoint, stats in report.items():
+            errors = ', '.join(
+                f'{kind}: {count}' for kind, count in stats['errors'].items()
+            ) or 'нет'
+            self.stdout.write(
+                f'{endpoint:<14} {stats["requests"]:>6} запросов '
+                f'{stats["rps"]:>8.1f} в с  4xx {stats["client_errors"]:>5}  '
+                f'p50 {stats["p50_ms"]:>8.1f}  p95 {stats["p95_ms"]:>8.1f}  '
+                f'p99 {stats["p99_ms"]:>8.1f} мс  ошибки: {errors}'
+            )
+        if 'locked_in_server_log' in report.get('*', {}):
+            self.stdout.write(
+                'Блокировок БД в журнале сервера: '
+                f'{report["*"]["locked_in_server_log"]}'
+            )
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
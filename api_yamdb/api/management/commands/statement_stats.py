@@ -0,0 +1,58 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.statements import (ORDERS, collect_statements, reset_saved,
+                            top_statements)
+
+
+class Command(BaseCommand):
+    help = ('top SQL statement fingerprints by time or calls, '
+            'collected by the running processes of the project')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=20)
+        parser.add_argument('--order', choices=ORDERS, default='total')
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='print the statistics as JSON',
+        )
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='reset the statistics of all running processes after '
+                 'printing; each process clears its own on the next save',
+        )
+
+    def report(self, statements):
+        self.stdout.write(
+            f'{"вызовов":>9} {"всего, мс":>11} {"среднее":>9} '
+            f'{"максимум":>9}  запрос'
+        )
+        for statement in statements:
+            self.stdout.write(
+                f'{statement["calls"]:>9} {statement["total_ms"]:>11.2f} '
+                f'{statement["mean_ms"]:>9.3f} {statement["max_ms"]:>9.3f}  '
+                f'{statement["fingerprint"]}'
+            )
+
+    def handle(self, *args, **options):
+        directory = settings.STATEMENT_STATS_DIR
+        statements = top_statements(
+            collect_statements(directory), options['limit'], options['order']
+        )
+        if options['json']:
+            self.stdout.write(
+                json.dumps(statements, ensure_ascii=False, indent=2)
+            )
+        elif statements:
+            self.report(statements)
+        else:
+            self.stdout.write(f'Статистика запросов в {directory} не найдена')
+        if options['reset']:
+            self.stdout.write(
+                f'Статистика сброшена, удалено файлов: '
+                f'{reset_saved(directory)}'
+            )
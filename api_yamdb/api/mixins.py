@@ -1,11 +1,122 @@
+from hashlib import sha1
+
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
 from rest_framework import filters, mixins, viewsets
 from rest_framework.mixins import CreateModelMixin
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
 
+from .pagination import CachedCountPagination
 from .permissions import IsAdminModeratorAuthororReadOnly
+from .versions import get_versions
+
+LIST_CACHE_STATS_KEY = 'list-cache:{}:{}'
+
+
+def record_list_cache_event(model_name, event):
+    key = LIST_CACHE_STATS_KEY.format(model_name, event)
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def get_list_cache_stats(model_names):
+    """Счётчики попаданий и промахов кэша списков по моделям."""
+    return {
+        model_name: {
+            event: cache.get(LIST_CACHE_STATS_KEY.format(model_name, event), 0)
+            for event in ('hits', 'misses')
+        }
+        for model_name in model_names
+    }
+
+
+class CachedListMixin:
+    """
+    Кэширует ответы list по строке поиска и номеру страницы.
+    Ключ включает версию таблицы модели, поэтому любая запись в таблицу
+    (через API, админку или импорт) делает закэшированные ответы
+    недействительными. Заголовок X-Cache показывает HIT или MISS.
+    """
+    list_cache_timeout = 300
+
+    def get_list_cache_key(self, request):
+        table = self.get_queryset().model._meta.db_table
+        params = sorted(request.query_params.lists())
+        raw = f'{request.get_host()}|{request.path}|{params}|'
+        raw += str(get_versions(table))
+        return 'list:' + sha1(raw.encode()).hexdigest()
+
+    def list(self, request, *args, **kwargs):
+        key = self.get_list_cache_key(request)
+        model_name = self.get_queryset().model._meta.model_name
+        data = cache.get(key)
+        if data is not None:
+            record_list_cache_event(model_name, 'hits')
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+        record_list_cache_event(model_name, 'misses')
+        response = super().list(request, *args, **kwargs)
+        cache.set(key, response.data, self.list_cache_timeout)
+        response['X-Cache'] = 'MISS'
+        return response
+
+
+class ConditionalGetMixin:
+    """
+    Условные GET-запросы (ETag/If-None-Match) для list. Валидаторы
+    строятся только по версиям из кэша, поэтому ответ 304 не выполняет
+    ни запроса к выборке, ни сериализации. По умолчанию используется
+    версия таблицы модели.
+
+    Last-Modified отдаётся справочно, If-Modified-Since не учитывается:
+    у даты HTTP точность в секунду, и запись в ту же секунду, что
+    и предыдущий ответ, осталась бы незамеченной. Версии в наносекундах
+    различает только ETag.
+    """
+    version_names = ()
+
+    def get_version_names(self):
+        if self.version_names:
+            return self.version_names
+        return (self.queryset.model._meta.db_table,)
+
+    def conditional_get(self, handler, request, *args, **kwargs):
+        versions = get_versions(*self.get_version_names())
+        etag = quote_etag(sha1(
+            f'{request.get_full_path()}|{request.accepted_renderer.format}|'
+            f'{versions}'.encode()
+        ).hexdigest())
+        last_modified = max(versions) // 10 ** 9
+        response = get_conditional_response(request, etag=etag)
+        if response is not None:
+            return response
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_get(super().list, request, *args, **kwargs)
+
+
+class ConditionalRetrieveMixin(ConditionalGetMixin):
+    """Условные GET-запросы для list и retrieve."""
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_get(
+            super().retrieve, request, *args, **kwargs
+        )
 
 
-class CreateDestroyListViewSet(mixins.CreateModelMixin,
+class CreateDestroyListViewSet(ConditionalGetMixin,
+                               CachedListMixin,
+                               mixins.CreateModelMixin,
                                mixins.DestroyModelMixin,
                                mixins.ListModelMixin,
                                viewsets.GenericViewSet,):
@@ -14,7 +125,7 @@ class CreateDestroyListViewSet(mixins.CreateModelMixin,
     filter_backends = [filters.SearchFilter]
     search_fields = ['name']
     lookup_field = 'slug'
-    pagination_class = PageNumberPagination
+    pagination_class = CachedCountPagination
 
 
 class CreateMixin(CreateModelMixin, viewsets.GenericViewSet):
@@ -0,0 +1,227 @@
+from base64 import b64decode, b64encode
+from binascii import Error as DecodeError
+from collections import OrderedDict
+from hashlib import sha1
+
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger
+from django.core.paginator import Paginator as DjangoPaginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (BasePagination, PageNumberPagination,
+                                       replace_query_param)
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .versions import get_versions, tables_in_sql
+
+COUNT_CACHE_TIMEOUT = 60
+
+
+class CachedCountPaginator(DjangoPaginator):
+    """
+    Пагинатор, берущий общее количество объектов из кэша.
+    Ключ строится по SQL выборки, то есть по параметрам фильтрации,
+    и по версиям затронутых таблиц, поэтому любая запись в таблицу
+    делает закэшированное значение недействительным.
+    """
+
+    @cached_property
+    def count(self):
+        try:
+            sql, params = self.object_list.query.sql_with_params()
+        except (AttributeError, EmptyResultSet):
+            return super().count
+        versions = get_versions(*tables_in_sql(sql))
+        key = 'count:' + sha1(
+            f'{sql}|{params!r}|{versions}'.encode()
+        ).hexdigest()
+        count = cache.get(key)
+        if count is None:
+            count = super().count
+            cache.set(key, count, COUNT_CACHE_TIMEOUT)
+        return count
+
+
+class UncountedPage(Page):
+
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+
+class UncountedPaginator(DjangoPaginator):
+    """
+    Пагинатор без подсчёта общего количества объектов.
+    О наличии следующей страницы он узнаёт, выбирая один лишний объект,
+    поэтому известное ему число страниц не больше номера текущей плюс один.
+    """
+    known_pages = 1
+
+    @property
+    def num_pages(self):
+        return self.known_pages
+
+    def validate_number(self, number):
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('Номер страницы не является числом.')
+        if number < 1:
+            raise EmptyPage('Номер страницы меньше 1.')
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        objects = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not objects and number > 1:
+            raise EmptyPage('На этой странице нет результатов.')
+        has_next = len(objects) > self.per_page
+        self.known_pages = number + has_next
+        return UncountedPage(objects[:self.per_page], number, self, has_next)
+
+
+class CachedCountPagination(PageNumberPagination):
+    """
+    Постраничная пагинация с кэшируемым общим количеством объектов.
+    Параметр `?count=false` отключает подсчёт: в ответе `count` равен None.
+    """
+    count_query_param = 'count'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.with_count = request.query_params.get(
+            self.count_query_param, ''
+        ).lower() not in ('false', '0')
+        if self.with_count:
+            self.django_paginator_class = CachedCountPaginator
+        else:
+            self.django_paginator_class = UncountedPaginator
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('count', self.page.paginator.count if self.with_count else None),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+
+class PubDateCursorPagination(BasePagination):
+    """
+    Keyset-пагинация по паре (pub_date, id) от новых объектов к старым.
+    Страница выбирается условием по ключу последнего показанного объекта,
+    поэтому любая страница стоит столько же, сколько первая,
+    и не требует подсчёта общего количества объектов.
+    """
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Неверный курсор.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        position = self.decode_cursor(request)
+        reverse = False
+        if position is None:
+            queryset = queryset.order_by('-pub_date', '-id')
+        else:
+            reverse, pub_date, pk = position
+            if reverse:
+                queryset = queryset.filter(
+                    Q(pub_date__gt=pub_date) | Q(pub_date=pub_date, id__gt=pk)
+                ).order_by('pub_date', 'id')
+            else:
+                queryset = queryset.filter(
+                    Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, id__lt=pk)
+                ).order_by('-pub_date', '-id')
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+        self.has_next = (has_more and not reverse) or (
+            reverse and bool(results)
+        )
+        self.has_previous = (position is not None and not reverse) or (
+            has_more and reverse
+        )
+        self.page = results
+        return results
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            direction, pub_date, pk = b64decode(
+                encoded.encode('ascii'), altchars=b'-_'
+            ).decode('ascii').split('|')
+            pub_date = parse_datetime(pub_date)
+            pk = int(pk)
+        except (UnicodeError, DecodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if pub_date is None or direction not in ('n', 'p'):
+            raise NotFound(self.invalid_cursor_message)
+        return direction == 'p', pub_date, pk
+
+    def encode_cursor(self, obj, reverse):
+        raw = f'{"p" if reverse else "n"}|{obj.pub_date.isoformat()}|{obj.pk}'
+        encoded = b64encode(raw.encode('ascii'), altchars=b'-_')
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded.decode('ascii')
+        )
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+
+class PubDateOptionalCursorPagination(CachedCountPagination):
+    """
+    Постраничная пагинация с включаемым по запросу режимом курсора.
+    Режим курсора включается параметром `?pagination=cursor`,
+    ссылки next/previous в этом режиме содержат параметр `cursor`.
+    """
+    mode_query_param = 'pagination'
+    cursor_pagination_class = PubDateCursorPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        cursor_mode = (
+            request.query_params.get(self.mode_query_param) == 'cursor'
+            or self.cursor_pagination_class.cursor_query_param
+            in request.query_params
+        )
+        if cursor_mode:
+            self.cursor_paginator = self.cursor_pagination_class()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
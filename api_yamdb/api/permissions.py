@@ -35,7 +35,7 @@ class IsAdminModeratorAuthororReadOnly(permissions.BasePermission):
         return request.method in permissions.SAFE_METHODS or (
             request.user.is_moderator
             or request.user.is_admin
-            or obj.author == request.user
+            or obj.author_id == request.user.id
             or request.user.is_superuser
         )
 
@@ -5,9 +5,19 @@ from rest_framework.relations import SlugRelatedField
 
 from reviews.models import Category, Comment, Genre, Review, Title
 from users.models import CustomUser
+from .instrumentation import TimedRepresentationMixin
 
 
-class UserSerializer(serializers.ModelSerializer):
+class TimedSerializer(TimedRepresentationMixin, serializers.Serializer):
+    """Сериализатор с замером времени представления объектов."""
+
+
+class TimedModelSerializer(TimedRepresentationMixin,
+                           serializers.ModelSerializer):
+    """Модельный сериализатор с замером времени представления объектов."""
+
+
+class UserSerializer(TimedModelSerializer):
     """Сериализатор для модели User."""
     class Meta:
         model = CustomUser
@@ -18,7 +28,7 @@ class UserSerializer(serializers.ModelSerializer):
         )
 
 
-class SignUpSerializer(serializers.Serializer):
+class SignUpSerializer(TimedSerializer):
     """Сериализатор для создания объектов класса User."""
     username = serializers.CharField(
         required=True,
@@ -53,7 +63,7 @@ class SignUpSerializer(serializers.Serializer):
         return data
 
 
-class ObtainTokenSerializer(serializers.ModelSerializer):
+class ObtainTokenSerializer(TimedModelSerializer):
     """Сериализатор для объектов класса User при получении токена."""
     username = serializers.RegexField(
         regex=r"^[\w.@+-]+$", max_length=150, required=True
@@ -65,7 +75,7 @@ class ObtainTokenSerializer(serializers.ModelSerializer):
         fields = ('username', 'confirmation_code')
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(TimedModelSerializer):
     """Сериализатор для модели Category."""
 
     class Meta:
@@ -73,7 +83,7 @@ class CategorySerializer(serializers.ModelSerializer):
         exclude = ('id', )
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(TimedModelSerializer):
     """Сериализатор для модели Genre."""
 
     class Meta:
@@ -81,7 +91,7 @@ class GenreSerializer(serializers.ModelSerializer):
         exclude = ('id', )
 
 
-class TitleGETSerializer(serializers.ModelSerializer):
+class TitleGETSerializer(TimedModelSerializer):
     """Сериализатор для объектов класса Title для обработки GET-запросов"""
     genre = GenreSerializer(many=True, read_only=True)
     category = CategorySerializer(read_only=True)
@@ -89,10 +99,10 @@ class TitleGETSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Title
-        fields = '__all__'
+        exclude = ('score_sum', 'reviews_count')
 
 
-class TitlePOSTSerializer(serializers.ModelSerializer):
+class TitlePOSTSerializer(TimedModelSerializer):
     """Сериализатор для объектов класса Title
     для обработки небезопасных запросов"""
     genre = serializers.SlugRelatedField(
@@ -107,10 +117,10 @@ class TitlePOSTSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Title
-        fields = '__all__'
+        exclude = ('score_sum', 'reviews_count')
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(TimedModelSerializer):
     """Сериализатор для класса отзывов."""
     author = SlugRelatedField(slug_field='username', read_only=True)
 
@@ -132,7 +142,7 @@ class ReviewSerializer(serializers.ModelSerializer):
         return data
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(TimedModelSerializer):
     """Сериализатор для класса комментариев к отзывам."""
     author = SlugRelatedField(read_only=True, slug_field='username')
 
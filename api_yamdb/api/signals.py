@@ -0,0 +1,29 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from reviews.models import Review, Title
+from reviews.signals import reviews_changed
+from .versions import bump_versions, title_reviews_version
+
+
+def bump_title_reviews(title_ids):
+    """Сдвигает версии отзывов произведений после фиксации записи."""
+    names = [title_reviews_version(title_id) for title_id in title_ids]
+    if names:
+        transaction.on_commit(lambda: bump_versions(*names))
+
+
+@receiver((post_save, post_delete), sender=Review)
+def bump_review_versions(sender, instance, **kwargs):
+    bump_title_reviews((instance.title_id,))
+
+
+@receiver(post_delete, sender=Title)
+def bump_deleted_title_versions(sender, instance, **kwargs):
+    bump_title_reviews((instance.id,))
+
+
+@receiver(reviews_changed)
+def bump_changed_reviews_versions(sender, title_ids, **kwargs):
+    bump_title_reviews(set(title_ids))
@@ -0,0 +1,243 @@
+import json
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections
+
+from .instrumentation import fingerprint_sql
+
+logger = logging.getLogger(__name__)
+
+ORDERS = ('total', 'mean', 'max', 'calls')
+CALLS, TOTAL, MAX = range(3)
+RESET_MARKER = 'reset'
+
+
+class StatementStats:
+    """
+    Статистика SQL-запросов процесса по формам (fingerprint_sql), как
+    в pg_stat_statements: число выполнений, суммарное и наибольшее время.
+    Числа строк, в отличие от pg_stat_statements, нет: rowcount курсора
+    SQLite для SELECT равен -1, а считать выбранные строки пришлось бы
+    обёрткой вокруг fetch* каждого курсора.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.save_lock = threading.Lock()
+        self.entries = {}
+        self.saved_at = time.monotonic()
+        self.reset_at = time.time()
+
+    def record(self, sql, elapsed):
+        fingerprint = fingerprint_sql(sql)
+        with self.lock:
+            entry = self.entries.get(fingerprint)
+            if entry is None:
+                entry = self.entries[fingerprint] = [0, 0.0, 0.0]
+            entry[CALLS] += 1
+            entry[TOTAL] += elapsed
+            entry[MAX] = max(entry[MAX], elapsed)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                fingerprint: list(entry)
+                for fingerprint, entry in self.entries.items()
+            }
+
+    def reset(self, reset_at=None):
+        with self.lock:
+            self.entries.clear()
+            self.reset_at = time.time() if reset_at is None else reset_at
+
+    def apply_reset(self, directory):
+        """
+        Очищает статистику процесса, если после прошлой очистки
+        её сбросили в directory (reset_saved). Запросы, выполненные между
+        сбросом и этой проверкой, тоже отбрасываются.
+        """
+        reset_at = read_reset_marker(directory)
+        if reset_at is not None and reset_at > self.reset_at:
+            self.reset(reset_at)
+
+    def save(self, directory):
+        """
+        Сохраняет статистику процесса в <directory>/<pid>.json, чтобы её
+        прочитала команда statement_stats из другого процесса.
+        """
+        self.saved_at = time.monotonic()
+        self.apply_reset(directory)
+        path = stats_path(directory, os.getpid())
+        with self.save_lock:
+            os.makedirs(directory, exist_ok=True)
+            with open(f'{path}.tmp', 'w', encoding='utf-8') as file:
+                json.dump(self.snapshot(), file, ensure_ascii=False)
+            os.replace(f'{path}.tmp', path)
+
+
+statement_stats = StatementStats()
+
+
+def stats_path(directory, pid):
+    return os.path.join(directory, f'{pid}.json')
+
+
+def read_reset_marker(directory):
+    """Время последнего сброса статистики в directory или None."""
+    try:
+        with open(
+            os.path.join(directory, RESET_MARKER), encoding='utf-8'
+        ) as file:
+            return float(file.read())
+    except (OSError, TypeError, ValueError):
+        return None
+
+
+def merge(snapshots):
+    merged = {}
+    for snapshot in snapshots:
+        for fingerprint, (calls, total, longest) in snapshot.items():
+            entry = merged.setdefault(fingerprint, [0, 0.0, 0.0])
+            entry[CALLS] += calls
+            entry[TOTAL] += total
+            entry[MAX] = max(entry[MAX], longest)
+    return merged
+
+
+def pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Процесс есть, но принадлежит другому пользователю.
+        return True
+    return True
+
+
+def load_saved(directory, exclude_pid=None):
+    """
+    Статистика, сохранённая работающими процессами в directory.
+    Файлы завершившихся процессов удаляются.
+    """
+    if not directory or not os.path.isdir(directory):
+        return []
+    snapshots = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith('.json') or name == f'{exclude_pid}.json':
+            continue
+        pid = name[:-len('.json')]
+        if pid.isdigit() and not pid_alive(int(pid)):
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass
+            continue
+        try:
+            with open(
+                os.path.join(directory, name), encoding='utf-8'
+            ) as file:
+                snapshots.append(json.load(file))
+        except (OSError, ValueError):
+            continue
+    return snapshots
+
+
+def reset_saved(directory):
+    """
+    Сбрасывает статистику всех процессов: записывает в directory метку
+    сброса и удаляет сохранённые файлы. Работающие процессы сверяются
+    с меткой при следующем сохранении или чтении статистики и очищают
+    свою. Возвращает число удалённых файлов.
+    """
+    if not directory:
+        return 0
+    os.makedirs(directory, exist_ok=True)
+    marker = os.path.join(directory, RESET_MARKER)
+    with open(f'{marker}.tmp', 'w', encoding='utf-8') as file:
+        file.write(repr(time.time()))
+    os.replace(f'{marker}.tmp', marker)
+    removed = 0
+    for name in os.listdir(directory):
+        if name.endswith('.json'):
+            os.remove(os.path.join(directory, name))
+            removed += 1
+    return removed
+
+
+def collect_statements(directory=None):
+    """
+    Статистика текущего процесса, объединённая с сохранённой другими
+    процессами в directory.
+    """
+    if directory:
+        statement_stats.apply_reset(directory)
+    return merge(
+        [statement_stats.snapshot()]
+        + load_saved(directory, exclude_pid=os.getpid())
+    )
+
+
+def top_statements(entries, limit=20, order='total'):
+    """
+    Первые limit форм запросов по убыванию order: total, mean, max
+    или calls. Время — в мс.
+    """
+    statements = [
+        {
+            'fingerprint': fingerprint,
+            'calls': calls,
+            'total_ms': round(total * 1000, 3),
+            'mean_ms': round(total / calls * 1000, 3),
+            'max_ms': round(longest * 1000, 3),
+        }
+        for fingerprint, (calls, total, longest) in entries.items()
+    ]
+    key = 'calls' if order == 'calls' else f'{order}_ms'
+    statements.sort(key=lambda statement: statement[key], reverse=True)
+    return statements[:limit]
+
+
+def record_statements(execute, sql, params, many, context):
+    """
+    Обёртка выполнения запросов, копящая статистику по формам запросов.
+    Раз в STATEMENT_STATS_SAVE_INTERVAL секунд сохраняет её в
+    STATEMENT_STATS_DIR.
+    """
+    started = time.perf_counter()
+    result = execute(sql, params, many, context)
+    statement_stats.record(sql, time.perf_counter() - started)
+    directory = settings.STATEMENT_STATS_DIR
+    if directory and time.monotonic() - statement_stats.saved_at >= (
+        settings.STATEMENT_STATS_SAVE_INTERVAL
+    ):
+        try:
+            statement_stats.save(directory)
+        except OSError:
+            logger.exception('Не удалось сохранить статистику запросов.')
+    return result
+
+
+def install_statement_stats(sender, connection, **kwargs):
+    if not getattr(settings, 'STATEMENT_STATS', False):
+        return
+    if record_statements not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_statements)
+
+
+def update_statement_stats(setting, **kwargs):
+    """
+    Подключает или отключает record_statements на открытых соединениях
+    при изменении STATEMENT_STATS, например фикстурой settings в тестах.
+    """
+    if setting != 'STATEMENT_STATS':
+        return
+    for connection in connections.all():
+        if getattr(settings, 'STATEMENT_STATS', False):
+            install_statement_stats(None, connection)
+        elif record_statements in connection.execute_wrappers:
+            connection.execute_wrappers.remove(record_statements)
@@ -5,7 +5,8 @@ from .views import (CategoryViewSet, TitleViewSet,
                     GenreViewSet, SignUpViewSet,
                     UserViewSet, CommentViewSet,
                     ReviewViewSet, TitleViewSet,
-                    ObtainTokenViewSet)
+                    ObtainTokenViewSet, ListCacheStatsView,
+                    StatementStatsView)
 
 app_name = 'api'
 
@@ -37,4 +38,14 @@ urlpatterns = [
         ObtainTokenViewSet.as_view({'post': 'create'}),
         name='token',
     ),
+    path(
+        'v1/cache-stats/',
+        ListCacheStatsView.as_view(),
+        name='cache_stats',
+    ),
+    path(
+        'v1/statement-stats/',
+        StatementStatsView.as_view(),
+        name='statement_stats',
+    ),
 ]
@@ -0,0 +1,77 @@
+import re
+import time
+from functools import lru_cache
+
+from django.apps import apps
+from django.core.cache import cache
+
+VERSION_KEY = 'version:{}'
+
+WRITE_RE = re.compile(
+    r'^\s*(?:INSERT\s+(?:OR\s+\w+\s+)?INTO|UPDATE|DELETE\s+FROM)\s+"?(\w+)"?',
+    re.IGNORECASE,
+)
+
+
+def title_reviews_version(title_id):
+    """Имя версии отзывов одного произведения."""
+    return f'title:{title_id}:reviews'
+
+
+def get_versions(*names):
+    """
+    Возвращает версии таблиц или других наборов данных.
+    Версия — время последней записи в наносекундах; отсутствующая в кэше
+    версия создаётся заново, что равносильно инвалидации.
+    """
+    keys = [VERSION_KEY.format(name) for name in names]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            cache.add(key, time.time_ns(), None)
+            found[key] = cache.get(key)
+    return tuple(found[key] for key in keys)
+
+
+def bump_versions(*names):
+    """Сдвигает версии, делая недействительными связанные с ними кэши."""
+    now = time.time_ns()
+    cache.set_many({VERSION_KEY.format(name): now for name in names}, None)
+
+
+@lru_cache(maxsize=None)
+def model_tables():
+    """Имена всех таблиц моделей проекта, включая промежуточные M2M."""
+    return tuple(
+        model._meta.db_table
+        for model in apps.get_models(include_auto_created=True)
+    )
+
+
+def tables_in_sql(sql):
+    """Таблицы моделей, упомянутые в тексте SQL-запроса."""
+    return [table for table in model_tables() if f'"{table}"' in sql]
+
+
+def track_writes(execute, sql, params, many, context):
+    """
+    Обёртка выполнения запросов, сдвигающая версию таблицы при каждой
+    записи в неё, включая bulk-операции и каскадные удаления.
+    В транзакции версия сдвигается только после её фиксации.
+    """
+    result = execute(sql, params, many, context)
+    match = WRITE_RE.match(sql)
+    if match is None:
+        return result
+    table = match.group(1)
+    connection = context['connection']
+    if connection.in_atomic_block:
+        connection.on_commit(lambda: bump_versions(table))
+    else:
+        bump_versions(table)
+    return result
+
+
+def install_write_tracking(sender, connection, **kwargs):
+    if track_writes not in connection.execute_wrappers:
+        connection.execute_wrappers.append(track_writes)
@@ -1,18 +1,23 @@
+from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
-from django.db.models import Avg
+from django.db import transaction
 from django.shortcuts import get_object_or_404
+from django.utils.functional import cached_property
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, permissions, status, viewsets
 from rest_framework.decorators import action
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import AccessToken
 
 from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.ratings import apply_score_change, rebuild_ratings
 from users.models import CustomUser
 from .filters import TitleFilter
-from .mixins import CreateDestroyListViewSet, CreateMixin
+from .mixins import (ConditionalRetrieveMixin, CreateDestroyListViewSet,
+                     CreateMixin, get_list_cache_stats)
+from .pagination import PubDateOptionalCursorPagination
 from .permissions import (IsAdmin, IsAdminModeratorAuthororReadOnly,
                           IsAdminOrReadOnly)
 from .serializers import (CategorySerializer, CommentSerializer,
@@ -21,6 +26,8 @@ from .serializers import (CategorySerializer, CommentSerializer,
                           TitleGETSerializer, TitlePOSTSerializer,
                           UserSerializer)
 from .utils import check_confirmation_code, send_confirmation_code
+from .statements import ORDERS, collect_statements, top_statements
+from .versions import title_reviews_version
 
 
 class SignUpViewSet(APIView):
@@ -101,7 +108,12 @@ class UserViewSet(viewsets.ModelViewSet):
             serializer.save()
             return Response(serializer.data, status=status.HTTP_200_OK)
         elif request.method == "DELETE":
-            user.delete()
+            with transaction.atomic():
+                title_ids = list(
+                    user.reviews.values_list('title_id', flat=True)
+                )
+                user.delete()
+                rebuild_ratings(title_ids)
             return Response(status=status.HTTP_204_NO_CONTENT)
         serializer = UserSerializer(user)
         return Response(serializer.data, status=status.HTTP_200_OK)
@@ -138,11 +150,51 @@ class GenreViewSet(CreateDestroyListViewSet):
     permission_classes = (IsAdminOrReadOnly,)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class ListCacheStatsView(APIView):
+    """Счётчики попаданий и промахов кэша списков категорий и жанров."""
+    permission_classes = (IsAdmin,)
+
+    def get(self, request):
+        return Response(get_list_cache_stats(('category', 'genre')))
+
+
+class StatementStatsView(APIView):
+    """
+    Статистика SQL-запросов по формам: процесса, обработавшего запрос,
+    и сохранённая другими процессами. Параметры limit и order.
+    """
+    permission_classes = (IsAdmin,)
+
+    def get(self, request):
+        order = request.query_params.get('order', 'total')
+        if order not in ORDERS:
+            raise ValidationError(
+                {'order': f'Допустимые значения: {", ".join(ORDERS)}.'}
+            )
+        try:
+            limit = int(request.query_params.get('limit', 20))
+        except ValueError:
+            limit = 0
+        if limit < 1:
+            raise ValidationError(
+                {'limit': 'Укажите целое положительное число.'}
+            )
+        return Response(top_statements(
+            collect_statements(settings.STATEMENT_STATS_DIR), limit, order
+        ))
+
+
+class TitleViewSet(ConditionalRetrieveMixin, viewsets.ModelViewSet):
     """Вьюсет для объектов класса Title"""
-    queryset = Title.objects.annotate(
-        rating=Avg('reviews__score')
-    ).order_by('id')
+    version_names = (
+        Title._meta.db_table,
+        Title.genre.through._meta.db_table,
+        Category._meta.db_table,
+        Genre._meta.db_table,
+    )
+    queryset = Title.objects.select_related(
+        'category'
+    ).prefetch_related('genre').order_by('id')
     permission_classes = (IsAdminOrReadOnly,)
     filter_backends = (DjangoFilterBackend, )
     filterset_class = TitleFilter
@@ -153,21 +205,41 @@ class TitleViewSet(viewsets.ModelViewSet):
         return TitlePOSTSerializer
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(ConditionalRetrieveMixin, viewsets.ModelViewSet):
     """Вьюсет для объектов класса Отзывов."""
     serializer_class = ReviewSerializer
     permission_classes = (IsAdminModeratorAuthororReadOnly,)
-    pagination_class = PageNumberPagination
+    pagination_class = PubDateOptionalCursorPagination
+
+    @cached_property
+    def title(self):
+        """Произведение из URL, запрашивается один раз за запрос."""
+        return get_object_or_404(Title, id=self.kwargs.get('title_id'))
+
+    def get_version_names(self):
+        return (
+            title_reviews_version(self.kwargs.get('title_id')),
+            CustomUser._meta.db_table,
+        )
 
     def get_queryset(self):
-        title_id = self.kwargs.get('title_id')
-        title = get_object_or_404(Title, id=title_id)
-        return title.reviews.all()
+        return self.title.reviews.select_related('author')
 
+    @transaction.atomic
     def perform_create(self, serializer):
-        title_id = self.kwargs.get('title_id')
-        title = get_object_or_404(Title, id=title_id)
-        serializer.save(author=self.request.user, title=title)
+        review = serializer.save(author=self.request.user, title=self.title)
+        apply_score_change(self.title.id, review.score, 1)
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        old_score = serializer.instance.score
+        review = serializer.save()
+        apply_score_change(review.title_id, review.score - old_score)
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        instance.delete()
+        apply_score_change(instance.title_id, -instance.score, -1)
 
 
 class CommentViewSet(viewsets.ModelViewSet):
@@ -175,14 +247,22 @@ class CommentViewSet(viewsets.ModelViewSet):
     serializer_class = CommentSerializer
     permission_classes = (IsAdminModeratorAuthororReadOnly,)
     queryset = Comment.objects.all()
-    pagination_class = PageNumberPagination
+    pagination_class = PubDateOptionalCursorPagination
+
+    @cached_property
+    def review(self):
+        """
+        Отзыв из URL, принадлежащий произведению из URL.
+        Запрашивается один раз за запрос.
+        """
+        return get_object_or_404(
+            Review,
+            id=self.kwargs.get('review_id'),
+            title_id=self.kwargs.get('title_id'),
+        )
 
     def get_queryset(self):
-        review_id = self.kwargs.get('review_id')
-        review = get_object_or_404(Review, id=review_id)
-        return review.comments.all()
+        return self.review.comments.select_related('author')
 
     def perform_create(self, serializer):
-        review_id = self.kwargs.get('review_id')
-        review = get_object_or_404(Review, id=review_id)
-        serializer.save(author=self.request.user, review=review)
+        serializer.save(author=self.request.user, review=self.review)
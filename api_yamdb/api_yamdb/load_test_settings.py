@@ -0,0 +1,19 @@
+"""
+Настройки сервера, который запускает команда load_test. Переменные
+окружения LOAD_TEST_DATABASE и LOAD_TEST_EMAIL_DIR подменяют файл БД
+и каталог писем, когда команда работает на временной БД.
+"""
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import DATABASES, EMAIL_FILE_PATH, MIDDLEWARE
+
+# Поиск N+1 замедляет каждый запрос и искажал бы замеры.
+NPLUSONE_DETECTION = None
+
+MIDDLEWARE = [*MIDDLEWARE, 'api.loadtest.ServerErrorMiddleware']
+
+if os.environ.get('LOAD_TEST_DATABASE'):
+    DATABASES['default']['NAME'] = os.environ['LOAD_TEST_DATABASE']
+
+EMAIL_FILE_PATH = os.environ.get('LOAD_TEST_EMAIL_DIR', EMAIL_FILE_PATH)
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from pathlib import Path
 
 from datetime import timedelta
@@ -33,6 +34,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.instrumentation.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -75,6 +77,21 @@ DATABASES = {
 }
 
 
+# Cache
+# Версии таблиц и закэшированные количества объектов хранятся здесь.
+# При нескольких процессах сервера нужен общий кэш (Memcached, Redis),
+# иначе запись в одном процессе не инвалидирует кэш других.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    }
+}
+
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -128,7 +145,7 @@ REST_FRAMEWORK = {
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.CachedCountPagination',
     'PAGE_SIZE': 10,
 }
 
@@ -138,3 +155,76 @@ SIMPLE_JWT = {
 }
 
 AUTH_USER_MODEL = 'users.CustomUser'
+
+# Счётчики запросов: SQL, сериализация, время view. Пишутся в лог
+# api.metrics и в заголовок Server-Timing для администраторов.
+# Выключенные не добавляют обёрток к выполнению SQL-запросов.
+REQUEST_METRICS = False
+
+# Отдавать Server-Timing всем клиентам, а не только администраторам.
+SERVER_TIMING_PUBLIC = False
+
+# Поиск N+1: None — выключен, 'log' — предупреждение в лог api.nplusone,
+# 'raise' — исключение NPlusOneError (для тестов). Включайте только
+# на время отладки: проверка добавляется к каждому запросу к API.
+NPLUSONE_DETECTION = None
+
+# Сколько однотипных запросов за один запрос к API считать N+1.
+NPLUSONE_THRESHOLD = 3
+
+# Журнал медленных SQL-запросов с планом выполнения: None — выключен,
+# иначе порог времени запроса в мс. Включается при подключении к БД.
+SLOW_QUERY_THRESHOLD_MS = None
+
+SLOW_QUERY_LOG = BASE_DIR / 'slow_queries.log'
+
+# Писать в журнал медленных запросов SQL как есть и значения параметров.
+# Выключено: в параметрах бывают адреса почты, хеши паролей и коды
+# подтверждения, поэтому по умолчанию пишется форма запроса
+# (fingerprint_sql) и число параметров.
+SLOW_QUERY_LOG_PARAMS = False
+
+# Статистика SQL-запросов по формам, как в pg_stat_statements.
+STATEMENT_STATS = False
+
+# Каталог, куда каждый процесс раз в STATEMENT_STATS_SAVE_INTERVAL секунд
+# сохраняет статистику для команды statement_stats. Файлы завершившихся
+# процессов удаляются при чтении. None — не сохранять.
+STATEMENT_STATS_DIR = Path(tempfile.gettempdir()) / 'api_yamdb_statements'
+
+STATEMENT_STATS_SAVE_INTERVAL = 60
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+        'slow_queries': {
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': SLOW_QUERY_LOG,
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 5,
+            'encoding': 'utf-8',
+            'delay': True,
+        },
+    },
+    'loggers': {
+        'api.metrics': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'api.nplusone': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+        'api.slow_queries': {
+            'handlers': ['slow_queries'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
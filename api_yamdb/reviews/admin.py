@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Comment, Review
+from .models import Category, Comment, Genre, Review
 
 
 @admin.register(Comment)
@@ -21,3 +21,19 @@ class ReviewAdmin(admin.ModelAdmin):
                     'score',
                     'pub_date'
                     )
+
+
+@admin.register(Category)
+class CategoryAdmin(admin.ModelAdmin):
+    list_display = ('id',
+                    'name',
+                    'slug'
+                    )
+
+
+@admin.register(Genre)
+class GenreAdmin(admin.ModelAdmin):
+    list_display = ('id',
+                    'name',
+                    'slug'
+                    )
@@ -0,0 +1,234 @@
+import os
+from itertools import islice
+
+import numpy as np
+from django.db import transaction
+from numpy.lib.format import open_memmap
+
+from .importer import CHUNK_SIZE
+from .models import Review, Title
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# Значение отсутствующего внешнего ключа в формате npy.
+NULL_ID = -1
+
+REVIEW_COLUMNS = (
+    ('title_id', np.int64),
+    ('author_id', np.int64),
+    ('score', np.int16),
+    ('pub_date', 'datetime64[us]'),
+)
+TITLE_COLUMNS = (
+    ('id', np.int64),
+    ('year', np.int16),
+    ('category_id', np.int64),
+)
+
+
+def default_format():
+    return 'parquet' if pyarrow is not None else 'npy'
+
+
+def to_array(values, dtype):
+    if np.dtype(dtype).kind == 'M':
+        # При USE_TZ даты хранятся в UTC, numpy не поддерживает tzinfo.
+        values = [value.replace(tzinfo=None) for value in values]
+    else:
+        values = [NULL_ID if value is None else value for value in values]
+    return np.array(values, dtype=dtype)
+
+
+def iter_column_chunks(queryset, columns, chunk_size=CHUNK_SIZE):
+    """
+    Перебирает выборку порциями, каждая порция — словарь массивов NumPy
+    по столбцам. Строки читаются курсором без кэша QuerySet.
+    """
+    names = [name for name, _ in columns]
+    rows = queryset.order_by('id').values_list(*names).iterator(
+        chunk_size=chunk_size
+    )
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield {
+            name: to_array(values, dtype)
+            for (name, dtype), values in zip(columns, zip(*chunk))
+        }
+
+
+def load_title_genres():
+    """
+    Связи произведений с жанрами в виде двух массивов одинаковой длины,
+    отсортированных по id произведения.
+    """
+    pairs = np.array(
+        Title.genre.through.objects.order_by('title_id', 'genre_id')
+        .values_list('title_id', 'genre_id'),
+        dtype=np.int64,
+    ).reshape(-1, 2)
+    return pairs[:, 0], pairs[:, 1]
+
+
+def genres_for(title_ids, genre_title_ids, genre_ids):
+    """
+    Жанры произведений порции в представлении CSR: смещения длиной
+    len(title_ids) + 1 и подряд идущие id жанров. Вычисляется без цикла
+    по произведениям.
+    """
+    starts = np.searchsorted(genre_title_ids, title_ids, 'left')
+    lengths = np.searchsorted(genre_title_ids, title_ids, 'right') - starts
+    offsets = np.zeros(len(title_ids) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    positions = (
+        np.arange(offsets[-1])
+        - np.repeat(offsets[:-1], lengths)
+        + np.repeat(starts, lengths)
+    )
+    return offsets, genre_ids[positions]
+
+
+def iter_title_chunks(chunk_size=CHUNK_SIZE):
+    genre_title_ids, genre_ids = load_title_genres()
+    for chunk in iter_column_chunks(
+        Title.objects.all(), TITLE_COLUMNS, chunk_size
+    ):
+        chunk['genre_offsets'], chunk['genre_ids'] = genres_for(
+            chunk['id'], genre_title_ids, genre_ids
+        )
+        yield chunk
+
+
+def iter_review_chunks(chunk_size=CHUNK_SIZE):
+    return iter_column_chunks(Review.objects.all(), REVIEW_COLUMNS, chunk_size)
+
+
+def open_column(directory, name, dtype, size):
+    return open_memmap(
+        os.path.join(directory, f'{name}.npy'),
+        mode='w+', dtype=dtype, shape=(size,),
+    )
+
+
+def write_npy(path, chunks, columns, with_genres, sizes):
+    """
+    Пишет каждый столбец в свой файл <path>/<столбец>.npy, который
+    читается через np.load(..., mmap_mode='r') без загрузки в память.
+    Файлы создаются нужной длины по sizes — (число строк, число связей
+    с жанрами) — и заполняются порция за порцией.
+    Жанры произведений хранятся парой genre_offsets/genre_ids:
+    жанры i-го произведения — genre_ids[genre_offsets[i]:genre_offsets[i+1]].
+    Отсутствующий внешний ключ записывается как NULL_ID.
+    """
+    rows, links = sizes
+    os.makedirs(path, exist_ok=True)
+    arrays = {
+        name: open_column(path, name, dtype, rows)
+        for name, dtype in columns
+    }
+    if with_genres:
+        arrays['genre_offsets'] = open_column(
+            path, 'genre_offsets', np.int64, rows + 1
+        )
+        arrays['genre_offsets'][0] = 0
+        arrays['genre_ids'] = open_column(path, 'genre_ids', np.int64, links)
+    count = genre_count = 0
+    for chunk in chunks:
+        size = len(chunk[columns[0][0]])
+        for name, _ in columns:
+            arrays[name][count:count + size] = chunk[name]
+        if with_genres:
+            arrays['genre_offsets'][count + 1:count + size + 1] = (
+                chunk['genre_offsets'][1:] + genre_count
+            )
+            genre_size = len(chunk['genre_ids'])
+            arrays['genre_ids'][genre_count:genre_count + genre_size] = (
+                chunk['genre_ids']
+            )
+            genre_count += genre_size
+        count += size
+    for array in arrays.values():
+        array.flush()
+    return count
+
+
+def to_record_batch(chunk, columns, with_genres=False):
+    arrays = []
+    names = []
+    for name, _ in columns:
+        values = chunk[name]
+        mask = values == NULL_ID if values.dtype.kind == 'i' else None
+        arrays.append(pyarrow.array(values, mask=mask))
+        names.append(name)
+    if with_genres:
+        arrays.append(pyarrow.ListArray.from_arrays(
+            pyarrow.array(chunk['genre_offsets'].astype(np.int32)),
+            pyarrow.array(chunk['genre_ids']),
+        ))
+        names.append('genre_ids')
+    return pyarrow.RecordBatch.from_arrays(arrays, names=names)
+
+
+def write_parquet(path, chunks, columns, with_genres, sizes):
+    """
+    Пишет порции в файл Parquet по одной группе строк на порцию,
+    поэтому размеры sizes заранее не нужны.
+    Жанры произведений — столбец списков genre_ids,
+    отсутствующий внешний ключ — null.
+    """
+    writer = None
+    count = 0
+    try:
+        for chunk in chunks:
+            batch = to_record_batch(chunk, columns, with_genres)
+            if writer is None:
+                writer = pyarrow.parquet.ParquetWriter(path, batch.schema)
+            writer.write_table(pyarrow.Table.from_batches([batch]))
+            count += batch.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    return count
+
+
+WRITERS = {
+    'npy': write_npy,
+    'parquet': write_parquet,
+}
+SUFFIXES = {
+    'npy': '',
+    'parquet': '.parquet',
+}
+
+
+def export_columns(output_dir, fmt=None, chunk_size=CHUNK_SIZE):
+    """
+    Выгружает отзывы и произведения в колоночный формат для анализа:
+    Parquet, если установлен pyarrow, иначе каталог файлов .npy NumPy
+    по одному на столбец. Всё читается в одной транзакции, поэтому
+    размеры и содержимое файлов согласованы между собой.
+    Возвращает словарь {путь: число строк}.
+    """
+    fmt = fmt or default_format()
+    if fmt == 'parquet' and pyarrow is None:
+        raise ImportError('Для выгрузки в Parquet установите pyarrow.')
+    os.makedirs(output_dir, exist_ok=True)
+    written = {}
+    with transaction.atomic():
+        for name, chunks, columns, with_genres, sizes in (
+            ('reviews', iter_review_chunks(chunk_size), REVIEW_COLUMNS,
+             False, (Review.objects.count(), 0)),
+            ('titles', iter_title_chunks(chunk_size), TITLE_COLUMNS,
+             True, (Title.objects.count(),
+                    Title.genre.through.objects.count())),
+        ):
+            path = os.path.join(output_dir, name + SUFFIXES[fmt])
+            written[path] = WRITERS[fmt](
+                path, chunks, columns, with_genres, sizes
+            )
+    return written
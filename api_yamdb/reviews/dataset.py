@@ -0,0 +1,88 @@
+from collections import namedtuple
+
+from users.models import CustomUser
+from .models import Category, Comment, Genre, Review, Title
+
+DatasetTable = namedtuple(
+    'DatasetTable', ('name', 'model', 'columns', 'optional')
+)
+DatasetTable.__new__.__defaults__ = ((),)
+DatasetTable.__doc__ = """
+Таблица CSV-набора данных: имя файла без расширения, модель,
+пары (столбец CSV, атрибут модели) и столбцы, которых может не быть
+в файле: тогда поля получают значения по умолчанию.
+"""
+
+# Порядок таблиц соответствует порядку внешних ключей.
+TABLES = (
+    DatasetTable('category', Category, (
+        ('id', 'id'),
+        ('name', 'name'),
+        ('slug', 'slug'),
+    )),
+    DatasetTable('genre', Genre, (
+        ('id', 'id'),
+        ('name', 'name'),
+        ('slug', 'slug'),
+    )),
+    DatasetTable('titles', Title, (
+        ('id', 'id'),
+        ('name', 'name'),
+        ('year', 'year'),
+        ('category', 'category_id'),
+        ('description', 'description'),
+    ), ('description',)),
+    DatasetTable('genre_title', Title.genre.through, (
+        ('id', 'id'),
+        ('title_id', 'title_id'),
+        ('genre_id', 'genre_id'),
+    )),
+    DatasetTable('users', CustomUser, (
+        ('id', 'id'),
+        ('username', 'username'),
+        ('email', 'email'),
+        ('role', 'role'),
+        ('bio', 'bio'),
+        ('first_name', 'first_name'),
+        ('last_name', 'last_name'),
+        ('password', 'password'),
+        ('is_superuser', 'is_superuser'),
+        ('is_staff', 'is_staff'),
+        ('is_active', 'is_active'),
+        ('date_joined', 'date_joined'),
+        ('last_login', 'last_login'),
+        ('confirmation_code', 'confirmation_code'),
+    ), (
+        'password', 'is_superuser', 'is_staff', 'is_active', 'date_joined',
+        'last_login', 'confirmation_code',
+    )),
+    DatasetTable('review', Review, (
+        ('id', 'id'),
+        ('title_id', 'title_id'),
+        ('text', 'text'),
+        ('author', 'author_id'),
+        ('score', 'score'),
+        ('pub_date', 'pub_date'),
+    )),
+    DatasetTable('comments', Comment, (
+        ('id', 'id'),
+        ('review_id', 'review_id'),
+        ('text', 'text'),
+        ('author', 'author_id'),
+        ('pub_date', 'pub_date'),
+    )),
+)
+
+
+def present_columns(table, header):
+    """
+    Пары (столбец CSV, атрибут модели) таблицы, которые есть в заголовке
+    файла header, и список обязательных столбцов, которых в нём нет.
+    """
+    header = set(header)
+    present = [pair for pair in table.columns if pair[0] in header]
+    missing = [
+        column for column, _ in table.columns
+        if column not in header and column not in table.optional
+    ]
+    return present, missing
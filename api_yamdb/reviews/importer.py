@@ -0,0 +1,428 @@
+import bz2
+import gzip
+import hashlib
+import lzma
+import os
+import pickle
+import tempfile
+import time
+import zipfile
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+import django
+import numpy as np
+import pandas as pd
+from django.apps import apps
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from .dataset import TABLES, present_columns
+from .models import Review
+from .signals import reviews_changed
+
+CHUNK_SIZE = 5000
+DELETE_BATCH_SIZE = 500
+
+# Расширения файла таблицы в порядке поиска в каталоге набора.
+SOURCE_SUFFIXES = ('.csv', '.csv.gz', '.csv.bz2', '.csv.xz', '.csv.zip')
+
+OPENERS = {
+    '.gz': gzip.open,
+    '.bz2': bz2.open,
+    '.xz': lzma.open,
+}
+
+
+class ArchiveMember(namedtuple('ArchiveMember', ('archive', 'name'))):
+    """Файл таблицы внутри zip-архива со всем набором."""
+
+    def __str__(self):
+        return f'{self.archive}:{self.name}'
+
+
+class DataImportError(Exception):
+    """Ошибка в данных импортируемого файла."""
+
+
+@contextmanager
+def keep_auto_now_add(model):
+    """
+    Временно отключает auto_now_add у полей модели,
+    чтобы при импорте сохранялись даты из файла.
+    """
+    fields = [
+        field for field in model._meta.local_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+@contextmanager
+def open_source(path):
+    """
+    Открывает файл таблицы на чтение в двоичном режиме. Сжатые файлы
+    и члены zip-архивов распаковываются потоком по мере чтения,
+    без промежуточных файлов на диске.
+    """
+    if isinstance(path, ArchiveMember):
+        with zipfile.ZipFile(path.archive) as archive:
+            with archive.open(path.name) as file:
+                yield file
+        return
+    suffix = os.path.splitext(path)[1]
+    if suffix == '.zip':
+        with zipfile.ZipFile(path) as archive:
+            names = [
+                name for name in archive.namelist() if not name.endswith('/')
+            ]
+            if len(names) != 1:
+                raise DataImportError(
+                    f'{path}: архив должен содержать ровно один файл'
+                )
+            with archive.open(names[0]) as file:
+                yield file
+        return
+    with OPENERS.get(suffix, open)(path, 'rb') as file:
+        yield file
+
+
+def find_sources(data_dir, tables=TABLES):
+    """
+    Находит файлы таблиц набора. data_dir — каталог с файлами
+    `<таблица>.csv`, в том числе сжатыми gzip, bzip2, xz или zip,
+    либо zip-архив с такими файлами. Возвращает пары (таблица, путь),
+    путь отсутствующего файла равен None.
+    """
+    if zipfile.is_zipfile(data_dir):
+        with zipfile.ZipFile(data_dir) as archive:
+            members = {
+                os.path.basename(name): name for name in archive.namelist()
+            }
+        sources = []
+        for table in tables:
+            name = members.get(f'{table.name}.csv')
+            sources.append(
+                (table, name and ArchiveMember(str(data_dir), name))
+            )
+        return sources
+    sources = []
+    for table in tables:
+        paths = [
+            os.path.join(data_dir, table.name + suffix)
+            for suffix in SOURCE_SUFFIXES
+        ]
+        sources.append((table, next(
+            (path for path in paths if os.path.exists(path)), None
+        )))
+    return sources
+
+
+def file_checksum(path):
+    """SHA-256 содержимого файла, читаемого блоками."""
+    digest = hashlib.sha256()
+    if isinstance(path, ArchiveMember):
+        opener = open_source(path)
+    else:
+        opener = open(path, 'rb')
+    with opener as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_chunks(path, columns, chunk_size=CHUNK_SIZE):
+    """
+    Читает CSV порциями фиксированного размера, значения — строки.
+    Из столбцов columns читаются те, что есть в файле.
+    """
+    columns = set(columns)
+    with open_source(path) as file:
+        yield from pd.read_csv(
+            file,
+            encoding='utf-8',
+            usecols=lambda column: column in columns,
+            dtype=str,
+            keep_default_na=False,
+            chunksize=chunk_size,
+        )
+
+
+def source_columns(table, path, header):
+    """
+    Столбцы таблицы, найденные в заголовке файла. Отсутствие
+    обязательного столбца — ошибка данных.
+    """
+    present, missing = present_columns(table, header)
+    if missing:
+        raise DataImportError(
+            f'{path}: нет столбцов {", ".join(missing)}'
+        )
+    return present
+
+
+def iter_chunks(sources, chunk_size=CHUNK_SIZE):
+    """
+    Перебирает порции строк файлов в порядке источников.
+    Возвращает четвёрки (таблица, атрибуты модели по столбцам,
+    список кортежей значений, номер первой строки порции).
+    """
+    for table, path in sources:
+        wanted = [column for column, _ in table.columns]
+        first_row = 1
+        for chunk in read_chunks(path, wanted, chunk_size):
+            present = source_columns(table, path, chunk.columns)
+            columns = [column for column, _ in present]
+            attnames = [attname for _, attname in present]
+            records = list(chunk[columns].itertuples(index=False, name=None))
+            yield table, attnames, records, first_row
+            first_row += len(records)
+
+
+def convert_value(field, value):
+    if value == '' and field.null:
+        return None
+    value = field.to_python(value)
+    if value is not None:
+        field.run_validators(value)
+    return value
+
+
+def prepare_rows(table, attnames, records, first_row):
+    """
+    Преобразует и проверяет порцию строк: приводит значения к типам
+    полей модели и запускает валидаторы полей. Возвращает словари
+    атрибутов модели.
+    """
+    fields = [table.model._meta.get_field(attname) for attname in attnames]
+    rows = []
+    for row_number, values in enumerate(records, first_row):
+        try:
+            rows.append({
+                field.attname: convert_value(field, value)
+                for field, value in zip(fields, values)
+            })
+        except ValidationError as error:
+            raise DataImportError(
+                f'{table.name}: строка {row_number}: '
+                f'{"; ".join(error.messages)}'
+            )
+    return rows
+
+
+def notify_reviews_changed(table, title_ids):
+    """
+    bulk_create и bulk_update не отправляют сигналы моделей, поэтому
+    об изменённых отзывах сообщается отдельно, чтобы сдвинуть версии
+    списков отзывов.
+    """
+    if table.model is Review and title_ids:
+        reviews_changed.send(sender=Review, title_ids=set(title_ids))
+
+
+def write_rows(table, rows):
+    """Вставляет порцию одним bulk_create в отдельной транзакции."""
+    with keep_auto_now_add(table.model), transaction.atomic():
+        table.model.objects.bulk_create(
+            [table.model(**attrs) for attrs in rows]
+        )
+        notify_reviews_changed(
+            table, [attrs.get('title_id') for attrs in rows]
+        )
+
+
+def setup_worker():
+    if not apps.ready:
+        django.setup()
+
+
+def get_table(name):
+    return next(table for table in TABLES if table.name == name)
+
+
+def spool_prepared(table_name, path, chunk_size, spool_dir):
+    """
+    Читает, разбирает и проверяет файл таблицы в процессе пула.
+    Подготовленные порции по одной дописываются в спул-файл в spool_dir,
+    поэтому память процесса не зависит от размера файла, а строки
+    не пересылаются через канал пула. Возвращает путь спул-файла.
+    """
+    table = get_table(table_name)
+    spool_path = os.path.join(spool_dir, f'{table.name}.pickle')
+    with open(spool_path, 'wb') as file:
+        for table, attnames, records, first_row in iter_chunks(
+            [(table, path)], chunk_size
+        ):
+            pickle.dump(
+                prepare_rows(table, attnames, records, first_row),
+                file, pickle.HIGHEST_PROTOCOL,
+            )
+    return spool_path
+
+
+def read_spool(spool_path):
+    """Перебирает порции спул-файла и удаляет его после чтения."""
+    try:
+        with open(spool_path, 'rb') as file:
+            while True:
+                try:
+                    yield pickle.load(file)
+                except EOFError:
+                    return
+    finally:
+        os.remove(spool_path)
+
+
+def iter_prepared(sources, chunk_size=CHUNK_SIZE, workers=1):
+    """
+    Перебирает подготовленные порции в порядке источников.
+
+    При workers > 1 файлы разбираются и проверяются целиком в пуле
+    процессов, по файлу на задачу, в порядке внешних ключей: пока
+    пишутся категории и жанры, пул уже готовит произведения,
+    пользователей, отзывы и комментарии. Порции файла отдаются, когда
+    файл разобран, так что запись идёт строго в порядке источников.
+    Файлы в zip-архивах и сжатые файлы разбираются так же, потоком.
+    """
+    if workers <= 1:
+        for table, attnames, records, first_row in iter_chunks(
+            sources, chunk_size
+        ):
+            yield table, prepare_rows(table, attnames, records, first_row)
+        return
+    with tempfile.TemporaryDirectory(prefix='read_csv_files_') as spool_dir:
+        executor = ProcessPoolExecutor(workers, initializer=setup_worker)
+        try:
+            futures = [
+                executor.submit(
+                    spool_prepared, table.name, path, chunk_size, spool_dir
+                )
+                for table, path in sources
+            ]
+            for (table, _), future in zip(sources, futures):
+                for rows in read_spool(future.result()):
+                    yield table, rows
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+
+def load_dataset(sources, chunk_size=CHUNK_SIZE, workers=1):
+    """
+    Загружает файлы в порядке источников, который должен соответствовать
+    порядку внешних ключей. Расход памяти не зависит от размера файлов.
+    При workers > 1 разбор идёт в пуле процессов (см. iter_prepared),
+    запись в БД остаётся последовательной.
+    После записи каждой таблицы возвращает тройку
+    (таблица, число строк, секунды записи).
+    """
+    stats = {table.name: [table, 0, 0.0] for table, _ in sources}
+    current = None
+    for table, rows in iter_prepared(sources, chunk_size, workers):
+        if current is not None and current != table.name:
+            yield tuple(stats.pop(current))
+        current = table.name
+        started = time.perf_counter()
+        write_rows(table, rows)
+        stats[table.name][1] += len(rows)
+        stats[table.name][2] += time.perf_counter() - started
+    for table_stats in stats.values():
+        yield tuple(table_stats)
+
+
+def sync_rows(table, rows):
+    """
+    Сравнивает порцию строк с записями БД по первичному ключу и применяет
+    разницу: новые строки вставляет, изменённые обновляет только по
+    изменившимся полям. Возвращает пару (вставлено, обновлено).
+    """
+    model = table.model
+    attnames = list(rows[0]) if rows else ['id']
+    existing = model.objects.only(*attnames).in_bulk(
+        [row['id'] for row in rows]
+    )
+    to_create = []
+    to_update = []
+    changed_fields = set()
+    title_ids = set()
+    for row in rows:
+        obj = existing.get(row['id'])
+        if obj is None:
+            to_create.append(model(**row))
+            title_ids.add(row.get('title_id'))
+            continue
+        changed = [
+            name for name, value in row.items() if getattr(obj, name) != value
+        ]
+        if not changed:
+            continue
+        title_ids.update((getattr(obj, 'title_id', None), row.get('title_id')))
+        for name in changed:
+            setattr(obj, name, row[name])
+        changed_fields.update(changed)
+        to_update.append(obj)
+    with keep_auto_now_add(model), transaction.atomic():
+        model.objects.bulk_create(to_create)
+        if to_update:
+            model.objects.bulk_update(to_update, sorted(changed_fields))
+        notify_reviews_changed(table, title_ids - {None})
+    return len(to_create), len(to_update)
+
+
+def delete_missing(table, kept_ids):
+    """
+    Удаляет записи, первичных ключей которых нет в файле.
+    kept_ids — отсортированный массив NumPy. Возвращает число удалённых.
+    """
+    model = table.model
+    deleted = 0
+    db_ids = model.objects.order_by().values_list('id', flat=True)
+    batch = []
+    for pk in db_ids.iterator():
+        batch.append(pk)
+        if len(batch) == DELETE_BATCH_SIZE:
+            deleted += delete_batch(model, batch, kept_ids)
+            batch = []
+    if batch:
+        deleted += delete_batch(model, batch, kept_ids)
+    return deleted
+
+
+def delete_batch(model, ids, kept_ids):
+    ids = np.asarray(ids, dtype=np.int64)
+    missing = ids[~np.isin(ids, kept_ids, assume_unique=True)].tolist()
+    if missing:
+        with transaction.atomic():
+            model.objects.filter(id__in=missing).delete()
+    return len(missing)
+
+
+def sync_dataset(sources, chunk_size=CHUNK_SIZE, workers=1):
+    """
+    Инкрементальная загрузка: приводит таблицы к содержимому файлов.
+    Вставки и обновления идут порциями в порядке внешних ключей,
+    удаления — в обратном порядке после них. Множество первичных ключей
+    каждого файла хранится массивом NumPy, по 8 байт на строку.
+    workers — как в load_dataset.
+    Возвращает словарь {имя таблицы: (вставлено, обновлено, удалено)}.
+    """
+    seen_ids = {table.name: [] for table, _ in sources}
+    stats = {table.name: [0, 0, 0] for table, _ in sources}
+    for table, rows in iter_prepared(sources, chunk_size, workers):
+        seen_ids[table.name].append(
+            np.fromiter((row['id'] for row in rows), dtype=np.int64)
+        )
+        inserted, updated = sync_rows(table, rows)
+        stats[table.name][0] += inserted
+        stats[table.name][1] += updated
+    for table, _ in reversed(sources):
+        ids = seen_ids[table.name]
+        kept_ids = np.unique(np.concatenate(ids)) if ids else np.array([])
+        stats[table.name][2] = delete_missing(table, kept_ids)
+    return {name: tuple(counts) for name, counts in stats.items()}
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.columnar import WRITERS, export_columns
+from reviews.importer import CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = ('exporting reviews and titles to Parquet (with pyarrow) '
+            'or NumPy .npy files for analytics')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output-dir',
+            default='analytics',
+            help='directory for reviews and titles, as .parquet files or '
+                 'as directories with one .npy file per column',
+        )
+        parser.add_argument(
+            '--format',
+            choices=sorted(WRITERS),
+            help='parquet if pyarrow is installed, npy otherwise by default',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=CHUNK_SIZE,
+            help='rows per database fetch and per Parquet row group',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            written = export_columns(
+                options['output_dir'], options['format'],
+                options['chunk_size'],
+            )
+        except ImportError as error:
+            raise CommandError(error)
+        for path, rows in written.items():
+            self.stdout.write(f'{path}: {rows} строк')
+        self.stdout.write(self.style.SUCCESS('Выгрузка завершена'))
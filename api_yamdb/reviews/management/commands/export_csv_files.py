@@ -0,0 +1,69 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.dataset import TABLES
+from reviews.exporter import FORMATS, export_dataset
+from reviews.importer import CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = 'exporting data to files in the format read by read_csv_files'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'tables',
+            nargs='*',
+            help='tables to export, all by default',
+        )
+        parser.add_argument(
+            '--output-dir',
+            default='export',
+            help='directory for the exported files',
+        )
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            default='csv',
+            help='csv for read_csv_files or ndjson',
+        )
+        parser.add_argument(
+            '--gzip',
+            action='store_true',
+            help='compress files with gzip',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=CHUNK_SIZE,
+            help='rows fetched from the database cursor at a time',
+        )
+
+    def get_tables(self, names):
+        if not names:
+            return TABLES
+        known = {table.name: table for table in TABLES}
+        unknown = [name for name in names if name not in known]
+        if unknown:
+            raise CommandError(
+                f'Неизвестные таблицы: {", ".join(unknown)}. '
+                f'Доступны: {", ".join(known)}'
+            )
+        return [known[name] for name in names]
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        for table, rows, elapsed in export_dataset(
+            self.get_tables(options['tables']),
+            options['output_dir'],
+            options['format'],
+            options['gzip'],
+            options['chunk_size'],
+        ):
+            self.stdout.write(
+                f'{table.name}: {rows} строк за {elapsed:.2f} с'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Выгрузка в {options["output_dir"]} завершена за '
+            f'{time.perf_counter() - started:.2f} с'
+        ))
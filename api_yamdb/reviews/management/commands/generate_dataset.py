@@ -0,0 +1,83 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.dataset import TABLES
+from reviews.importer import CHUNK_SIZE
+from reviews.ratings import rebuild_ratings
+from reviews.synthetic import (generate_dataset, write_csv_files,
+                               write_database)
+
+
+class Command(BaseCommand):
+    help = ('generating a reproducible synthetic dataset into the database '
+            'or into csv files read by read_csv_files')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--titles', type=int, default=1000)
+        parser.add_argument('--genres', type=int, default=30)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument(
+            '--reviews',
+            type=int,
+            default=10000,
+            help='reviews to spread over titles; a title gets at most '
+                 'one review per user',
+        )
+        parser.add_argument(
+            '--comments-per-review',
+            type=float,
+            default=0.5,
+            help='mean of the Poisson number of comments per review',
+        )
+        parser.add_argument(
+            '--alpha',
+            type=float,
+            default=1.2,
+            help='power-law exponent of reviews per title popularity',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--output-dir',
+            help='write csv files here instead of the database',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=CHUNK_SIZE,
+            help='rows per batch insert and per transaction',
+        )
+
+    def write_to_database(self, frames, chunk_size):
+        filled = [
+            table.name for table in TABLES if table.model.objects.exists()
+        ]
+        if filled:
+            raise CommandError(
+                f'Таблицы уже содержат данные: {", ".join(filled)}'
+            )
+        write_database(frames, chunk_size)
+        rebuild_ratings()
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        frames = generate_dataset(
+            users=options['users'],
+            titles=options['titles'],
+            genres=options['genres'],
+            categories=options['categories'],
+            reviews=options['reviews'],
+            comments_per_review=options['comments_per_review'],
+            alpha=options['alpha'],
+            seed=options['seed'],
+        )
+        if options['output_dir']:
+            write_csv_files(frames, options['output_dir'])
+        else:
+            self.write_to_database(frames, options['chunk_size'])
+        for name, frame in frames.items():
+            self.stdout.write(f'{name}: {len(frame)} строк')
+        self.stdout.write(self.style.SUCCESS(
+            f'Набор создан за {time.perf_counter() - started:.2f} с'
+        ))
@@ -1,106 +1,147 @@
-import pandas as pd
+import os
+import time
 
-from django.core.management.base import BaseCommand
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
 
-from reviews.models import Category, Comment, Genre, Review, Title
-from users.models import CustomUser
+from reviews.importer import (CHUNK_SIZE, DataImportError, file_checksum,
+                              find_sources, load_dataset, sync_dataset)
+from reviews.models import ImportedFile
+from reviews.ratings import rebuild_ratings
+from reviews.validation import DatasetChecker
+
+RATING_TABLES = ('titles', 'review')
 
 
 class Command(BaseCommand):
     help = 'importing data from csv'
 
     def add_arguments(self, parser):
-        pass
+        parser.add_argument(
+            '--data-dir',
+            default=settings.BASE_DIR / 'static' / 'data',
+            help='directory with <table>.csv files, optionally compressed '
+                 'with gzip, bzip2, xz or zip, or a zip bundle of them',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=CHUNK_SIZE,
+            help='rows per batch insert and per transaction',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='processes that read, parse and validate whole files ahead '
+                 'of the writes; database writes stay sequential in '
+                 'foreign key order',
+        )
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='skip unchanged files, apply only inserts, updates and '
+                 'deletes by primary key for changed ones',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='only validate the files and write an error report, '
+                 'do not touch the database',
+        )
+        parser.add_argument(
+            '--report',
+            default='import_errors.csv',
+            help='path of the per-row error report written by --dry-run',
+        )
 
-    def handle(self, *args, **options):
-        df = pd.read_csv('static/data/category.csv')
-        for import_name, import_slug in zip(df.name, df.slug):
-            models = Category(name=import_name, slug=import_slug)
-            models.save()
+    def get_sources(self, data_dir):
+        if not os.path.exists(data_dir):
+            raise CommandError(f'{data_dir} не найден')
+        sources = []
+        for table, path in find_sources(data_dir):
+            if path is None:
+                self.stdout.write(self.style.WARNING(
+                    f'{table.name}: файл не найден в {data_dir}'
+                ))
+                continue
+            sources.append((table, path))
+        return sources
 
-        df = pd.read_csv('static/data/genre.csv')
-        for import_name, import_slug in zip(df.name, df.slug):
-            models = Genre(name=import_name, slug=import_slug)
-            models.save()
+    def get_changed(self, sources, checksums):
+        stored = dict(ImportedFile.objects.values_list('name', 'checksum'))
+        changed = []
+        for table, path in sources:
+            if stored.get(table.name) == checksums[table.name]:
+                self.stdout.write(f'{table.name}: файл не изменился')
+                continue
+            changed.append((table, path))
+        return changed
 
-        df = pd.read_csv('static/data/titles.csv')
-        for import_name, import_year, import_category in zip(
-            df.name, df.year, df.category
+    def load(self, sources, options):
+        for table, rows, elapsed in load_dataset(
+            sources, options['chunk_size'], options['workers']
         ):
-            models = Title(
-                name=import_name,
-                year=import_year,
-                category=Category(import_category)
+            self.stdout.write(
+                f'{table.name}: {rows} строк, запись {elapsed:.2f} с '
+                f'({rows / max(elapsed, 1e-6):.0f} строк/с)'
             )
-            models.save()
 
-        df = pd.read_csv('static/data/users.csv')
-        for (
-            import_id,
-            import_username,
-            import_email,
-            import_role,
-            import_bio,
-            import_fn,
-            import_ln,
-        ) in zip(
-            df.id,
-            df.username,
-            df.email,
-            df.role,
-            df.bio,
-            df.first_name,
-            df.last_name
-        ):
-            models = CustomUser(
-                id=import_id,
-                username=import_username,
-                email=import_email,
-                role=import_role,
-                bio=import_bio,
-                first_name=import_fn,
-                last_name=import_ln,
+    def sync(self, sources, options):
+        stats = sync_dataset(
+            sources, options['chunk_size'], options['workers']
+        )
+        for name, (inserted, updated, deleted) in stats.items():
+            self.stdout.write(
+                f'{name}: добавлено {inserted}, изменено {updated}, '
+                f'удалено {deleted}'
             )
-            models.save()
+        return stats
 
-        df = pd.read_csv('static/data/review.csv')
-        for (
-            import_title_id,
-            import_text,
-            import_author,
-            import_score,
-            import_pub_date,
-        ) in zip(
-            df.title_id,
-            df.text,
-            df.author,
-            df.score,
-            df.pub_date
-        ):
-            models = Review(
-                title_id=import_title_id,
-                text=import_text,
-                author=CustomUser(import_author),
-                score=import_score,
-                pub_date=import_pub_date,
+    def validate(self, sources, options):
+        report = DatasetChecker(sources, options['chunk_size']).run()
+        report.to_csv(options['report'], index=False)
+        for table, _ in sources:
+            errors = (report['file'] == table.name).sum()
+            self.stdout.write(f'{table.name}: ошибок {errors}')
+        if not report.empty:
+            raise CommandError(
+                f'Найдено ошибок: {len(report)}, '
+                f'отчёт записан в {options["report"]}'
             )
-            models.save()
+        self.stdout.write(self.style.SUCCESS('Ошибок в данных не найдено'))
 
-        df = pd.read_csv('static/data/comments.csv')
-        for (
-            import_review_id,
-            import_text,
-            import_author,
-            import_pub_date) in zip(
-            df.review_id,
-            df.text,
-            df.author,
-            df.pub_date
-        ):
-            models = Comment(
-                review_id=import_review_id,
-                text=import_text,
-                author=CustomUser(import_author),
-                pub_date=import_pub_date,
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        sources = self.get_sources(options['data_dir'])
+        if options['dry_run']:
+            return self.validate(sources, options)
+        checksums = {
+            table.name: file_checksum(path) for table, path in sources
+        }
+        deleted = False
+        try:
+            if options['incremental']:
+                sources = self.get_changed(sources, checksums)
+                stats = self.sync(sources, options)
+                deleted = any(counts[2] for counts in stats.values())
+            else:
+                self.load(sources, options)
+        except DataImportError as error:
+            raise CommandError(error)
+        for table, _ in sources:
+            ImportedFile.objects.update_or_create(
+                name=table.name, defaults={'checksum': checksums[table.name]}
             )
-            models.save()
+        drift = []
+        # Удаление пользователя, категории или произведения каскадом
+        # удаляет отзывы, поэтому после любых удалений рейтинг
+        # пересчитывается, даже если review.csv не менялся.
+        if deleted or any(
+            table.name in RATING_TABLES for table, _ in sources
+        ):
+            drift = rebuild_ratings()
+        self.stdout.write(self.style.SUCCESS(
+            f'Импорт завершён за {time.perf_counter() - started:.2f} с, '
+            f'пересчитан рейтинг произведений: {len(drift)}'
+        ))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from reviews.ratings import rebuild_ratings
+
+
+class Command(BaseCommand):
+    help = 'rebuilding title rating aggregates from reviews'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='only report drift, do not write anything',
+        )
+
+    def handle(self, *args, **options):
+        drift = rebuild_ratings(dry_run=options['dry_run'])
+        for title_id, stored, expected in drift:
+            self.stdout.write(
+                f'Произведение {title_id}: сумма/количество '
+                f'{stored[0]}/{stored[1]} -> {expected[0]}/{expected[1]}'
+            )
+        action = 'найдено' if options['dry_run'] else 'исправлено'
+        self.stdout.write(
+            self.style.SUCCESS(f'Расхождений {action}: {len(drift)}')
+        )
@@ -74,6 +74,16 @@ class Title(models.Model):
         related_name='titles',
         verbose_name='Категория'
     )
+    score_sum = models.PositiveIntegerField(
+        verbose_name='Сумма оценок',
+        default=0,
+        editable=False
+    )
+    reviews_count = models.PositiveIntegerField(
+        verbose_name='Количество отзывов',
+        default=0,
+        editable=False
+    )
 
     class Meta:
         verbose_name = 'Произведение',
@@ -83,6 +93,13 @@ class Title(models.Model):
     def __str__(self):
         return self.name
 
+    @property
+    def rating(self):
+        """Средняя оценка произведения по сохранённым агрегатам."""
+        if not self.reviews_count:
+            return None
+        return self.score_sum // self.reviews_count
+
 
 class Review(models.Model):
     """Класс отзывов."""
@@ -114,6 +131,12 @@ class Review(models.Model):
                 name='unique_author_title'
             ),
         )
+        indexes = (
+            models.Index(
+                fields=['title', 'pub_date', 'id'],
+                name='review_title_pub_date_idx'
+            ),
+        )
 
 
 class Comment(models.Model):
@@ -137,3 +160,34 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ['-pub_date']
+        indexes = (
+            models.Index(
+                fields=['review', 'pub_date', 'id'],
+                name='comment_review_pub_date_idx'
+            ),
+        )
+
+
+class ImportedFile(models.Model):
+    """Контрольная сумма последнего импортированного файла данных."""
+    name = models.CharField(
+        verbose_name='Файл',
+        max_length=100,
+        unique=True
+    )
+    checksum = models.CharField(
+        verbose_name='Контрольная сумма',
+        max_length=64
+    )
+    imported_at = models.DateTimeField(
+        verbose_name='Дата импорта',
+        auto_now=True
+    )
+
+    class Meta:
+        verbose_name = 'Импортированный файл'
+        verbose_name_plural = 'Импортированные файлы'
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
@@ -0,0 +1,54 @@
+from django.db import transaction
+from django.db.models import Count, F, Sum
+
+from .models import Review, Title
+from .signals import reviews_changed
+
+BATCH_SIZE = 1000
+
+
+def apply_score_change(title_id, score_delta, count_delta=0):
+    """Сдвигает сохранённые агрегаты оценок произведения."""
+    Title.objects.filter(id=title_id).update(
+        score_sum=F('score_sum') + score_delta,
+        reviews_count=F('reviews_count') + count_delta,
+    )
+    reviews_changed.send(sender=Title, title_ids=(title_id,))
+
+
+def rebuild_ratings(title_ids=None, dry_run=False):
+    """
+    Пересчитывает агрегаты оценок по таблице отзывов.
+    Возвращает список расхождений вида
+    (id, (старая сумма, старое количество), (сумма, количество)).
+    """
+    reviews = Review.objects.all()
+    titles = Title.objects.only('id', 'score_sum', 'reviews_count')
+    if title_ids is not None:
+        reviews = reviews.filter(title_id__in=title_ids)
+        titles = titles.filter(id__in=title_ids)
+    actual = {
+        row['title_id']: (row['score_sum'], row['reviews_count'])
+        for row in reviews.order_by().values('title_id').annotate(
+            score_sum=Sum('score'),
+            reviews_count=Count('id'),
+        )
+    }
+    drift = []
+    changed = []
+    for title in titles.order_by('id').iterator(chunk_size=BATCH_SIZE):
+        stored = (title.score_sum, title.reviews_count)
+        expected = actual.get(title.id, (0, 0))
+        if stored == expected:
+            continue
+        drift.append((title.id, stored, expected))
+        title.score_sum, title.reviews_count = expected
+        changed.append(title)
+    if changed and not dry_run:
+        with transaction.atomic():
+            Title.objects.bulk_update(
+                changed,
+                ('score_sum', 'reviews_count'),
+                batch_size=BATCH_SIZE,
+            )
+    return drift
@@ -0,0 +1,6 @@
+from django.dispatch import Signal
+
+# Отзывы произведений изменены в обход сигналов моделей: bulk_create,
+# bulk_update или update(). Аргумент title_ids — id затронутых
+# произведений.
+reviews_changed = Signal()
@@ -0,0 +1,212 @@
+import datetime
+import os
+
+import numpy as np
+import pandas as pd
+
+from users.models import CustomUser
+from .dataset import TABLES
+from .importer import CHUNK_SIZE, write_rows
+
+WORDS = (
+    'фильм', 'книга', 'сюжет', 'герой', 'финал', 'автор', 'музыка', 'сцена',
+    'отличный', 'скучный', 'неожиданный', 'добрый', 'мрачный', 'смешной',
+    'очень', 'совсем', 'немного', 'снова', 'всегда', 'никогда',
+    'понравился', 'разочаровал', 'удивил', 'затянут', 'пересмотрю',
+)
+MAX_WORDS = 30
+# Границы дат постоянны, чтобы набор зависел только от seed.
+FIRST_DATE = datetime.datetime(2015, 1, 1, tzinfo=datetime.timezone.utc)
+LAST_DATE = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+COMMENT_DELAY = 30 * 24 * 3600
+# Вероятности оценок 1–10: оценки смещены к высоким, как на практике.
+SCORE_WEIGHTS = np.array([2, 1, 2, 3, 5, 8, 14, 22, 21, 22], dtype=float)
+ROLES = (CustomUser.USER, CustomUser.MODERATOR, CustomUser.ADMIN)
+ROLE_WEIGHTS = (0.98, 0.015, 0.005)
+
+
+def distinct_picks(rng, counts, size):
+    """
+    Для каждой группы выбирает counts[i] различных чисел из range(size):
+    арифметическую прогрессию по модулю size со случайными началом
+    и шагом, взаимно простым с size. Возвращает плоский массив
+    выбранных чисел по группам подряд. counts[i] не больше size.
+    """
+    groups = len(counts)
+    starts = rng.integers(0, size, groups)
+    steps = rng.integers(1, max(size, 2), groups)
+    coprime = np.gcd(steps, size) == 1
+    while not coprime.all():
+        steps[~coprime] = rng.integers(1, size, (~coprime).sum())
+        coprime = np.gcd(steps, size) == 1
+    offsets = np.arange(counts.sum()) - np.repeat(
+        np.cumsum(counts) - counts, counts
+    )
+    return (
+        np.repeat(starts, counts) + offsets * np.repeat(steps, counts)
+    ) % size
+
+
+def power_law_counts(rng, total, groups, alpha, limit):
+    """
+    Раскладывает total объектов по groups группам с убывающими
+    по степенному закону размерами (ранг^-alpha) в случайном порядке групп.
+    Размер группы ограничен limit, излишек отбрасывается.
+    """
+    weights = 1 / np.arange(1, groups + 1) ** alpha
+    counts = rng.multinomial(total, weights / weights.sum())
+    return np.minimum(rng.permutation(counts), limit)
+
+
+def random_texts(rng, count):
+    lengths = rng.integers(3, MAX_WORDS + 1, count)
+    words = np.array(WORDS)[rng.integers(0, len(WORDS), (count, MAX_WORDS))]
+    return [
+        ' '.join(row[:length]).capitalize() + '.'
+        for row, length in zip(words.tolist(), lengths.tolist())
+    ]
+
+
+def random_dates(rng, count, start, end):
+    seconds = rng.integers(
+        int(start.timestamp()), int(end.timestamp()), count
+    )
+    return pd.to_datetime(seconds, unit='s', utc=True)
+
+
+def ids(count):
+    return np.arange(1, count + 1)
+
+
+def generate_users(rng, count):
+    names = [f'user{pk}' for pk in ids(count)]
+    return pd.DataFrame({
+        'id': ids(count),
+        'username': names,
+        'email': [f'{name}@yamdb.fake' for name in names],
+        'role': rng.choice(ROLES, count, p=ROLE_WEIGHTS),
+        'bio': '',
+        'first_name': '',
+        'last_name': '',
+    })
+
+
+def generate_titles(rng, count, categories, genres):
+    titles = pd.DataFrame({
+        'id': ids(count),
+        'name': [f'Произведение {pk}' for pk in ids(count)],
+        'year': rng.integers(1900, LAST_DATE.year + 1, count),
+        'category': rng.integers(1, categories + 1, count),
+    })
+    genre_counts = np.minimum(rng.integers(1, 4, count), genres)
+    genre_title = pd.DataFrame({
+        'id': ids(genre_counts.sum()),
+        'title_id': np.repeat(titles['id'].values, genre_counts),
+        'genre_id': distinct_picks(rng, genre_counts, genres) + 1,
+    })
+    return titles, genre_title
+
+
+def generate_reviews(rng, count, titles, users, alpha):
+    per_title = power_law_counts(rng, count, titles, alpha, users)
+    total = per_title.sum()
+    return pd.DataFrame({
+        'id': ids(total),
+        'title_id': np.repeat(ids(titles), per_title),
+        'text': random_texts(rng, total),
+        'author': distinct_picks(rng, per_title, users) + 1,
+        'score': rng.choice(
+            np.arange(1, 11), total, p=SCORE_WEIGHTS / SCORE_WEIGHTS.sum()
+        ),
+        'pub_date': random_dates(rng, total, FIRST_DATE, LAST_DATE),
+    })
+
+
+def generate_comments(rng, reviews, mean, users):
+    per_review = rng.poisson(mean, len(reviews))
+    total = per_review.sum()
+    delays = pd.to_timedelta(rng.integers(0, COMMENT_DELAY, total), unit='s')
+    pub_dates = reviews['pub_date'].repeat(per_review).reset_index(drop=True)
+    return pd.DataFrame({
+        'id': ids(total),
+        'review_id': np.repeat(reviews['id'].values, per_review),
+        'text': random_texts(rng, total),
+        'author': rng.integers(1, users + 1, total),
+        'pub_date': (pub_dates + delays).clip(upper=LAST_DATE),
+    })
+
+
+def generate_dataset(users=1000, titles=1000, genres=30, categories=10,
+                     reviews=10000, comments_per_review=0.5, alpha=1.2,
+                     seed=0):
+    """
+    Генерирует набор данных в формате read_csv_files: словарь
+    {имя таблицы: DataFrame} в порядке внешних ключей.
+    Число отзывов на произведение распределено по степенному закону
+    с показателем alpha, число комментариев на отзыв — по Пуассону.
+    Один автор оставляет не больше одного отзыва на произведение,
+    поэтому отзывов может получиться меньше запрошенного.
+    При одинаковом seed результат совпадает.
+    """
+    rng = np.random.default_rng(seed)
+    frames = {
+        'category': pd.DataFrame({
+            'id': ids(categories),
+            'name': [f'Категория {pk}' for pk in ids(categories)],
+            'slug': [f'category-{pk}' for pk in ids(categories)],
+        }),
+        'genre': pd.DataFrame({
+            'id': ids(genres),
+            'name': [f'Жанр {pk}' for pk in ids(genres)],
+            'slug': [f'genre-{pk}' for pk in ids(genres)],
+        }),
+    }
+    frames['titles'], frames['genre_title'] = generate_titles(
+        rng, titles, categories, genres
+    )
+    frames['users'] = generate_users(rng, users)
+    frames['review'] = generate_reviews(
+        rng, reviews, titles, users, alpha
+    )
+    frames['comments'] = generate_comments(
+        rng, frames['review'], comments_per_review, users
+    )
+    return frames
+
+
+def dataset_sizes(reviews):
+    """Размеры остальных таблиц набора для заданного числа отзывов."""
+    return {
+        'users': max(100, reviews // 20),
+        'titles': max(20, reviews // 50),
+        'reviews': reviews,
+    }
+
+
+def write_csv_files(frames, output_dir):
+    """Записывает набор в файлы <таблица>.csv, которые читает импорт."""
+    os.makedirs(output_dir, exist_ok=True)
+    for name, frame in frames.items():
+        frame.to_csv(
+            os.path.join(output_dir, f'{name}.csv'),
+            index=False,
+            date_format='%Y-%m-%dT%H:%M:%S.%fZ',
+        )
+
+
+def write_database(frames, chunk_size=CHUNK_SIZE):
+    """
+    Записывает набор в БД порциями через bulk_create, минуя разбор
+    строк: значения уже имеют типы полей моделей.
+    Возвращает словарь {имя таблицы: число строк}.
+    """
+    written = {}
+    for table in TABLES:
+        frame = frames[table.name].rename(columns=dict(table.columns))
+        for start in range(0, len(frame), chunk_size):
+            write_rows(
+                table,
+                frame.iloc[start:start + chunk_size].to_dict('records'),
+            )
+        written[table.name] = len(frame)
+    return written
@@ -0,0 +1,248 @@
+import numpy as np
+import pandas as pd
+from django.core.validators import RegexValidator
+from django.db import models
+
+from .dataset import present_columns
+from .importer import CHUNK_SIZE, read_chunks
+from .validators import (SCORE_MAX, SCORE_MIN, YEAR_MIN, max_year,
+                         score_validator, year_validator)
+
+REPORT_COLUMNS = ('file', 'row', 'column', 'value', 'error')
+LOOKUP_BATCH_SIZE = 500
+
+
+def value_ranges():
+    """Границы значений, которые проверяют валидаторы моделей."""
+    return {
+        score_validator: (SCORE_MIN, SCORE_MAX),
+        year_validator: (YEAR_MIN, max_year()),
+    }
+
+
+def lookup_values(field, values):
+    """Значения, которые можно подставить в запрос по полю field."""
+    prepared = []
+    for value in values:
+        try:
+            prepared.append(field.get_prep_value(value))
+        except (TypeError, ValueError):
+            continue
+    return prepared
+
+
+def row_hashes(frame, columns):
+    """64-битные хеши значений столбцов columns по строкам порции."""
+    return pd.util.hash_pandas_object(
+        frame[columns], index=False
+    ).to_numpy()
+
+
+class DatasetChecker:
+    """
+    Векторная проверка CSV-набора данных без записи в БД.
+    Файлы читаются порциями, каждое правило применяется к столбцу
+    порции целиком: типы и диапазоны значений, длины, регулярные
+    выражения и варианты выбора полей, уникальность в файле и в БД,
+    существование внешних ключей среди строк других файлов и записей
+    БД. Между порциями хранятся только массивы NumPy первичных ключей
+    и хешей уникальных значений, по 8 байт на строку.
+    """
+
+    def __init__(self, sources, chunk_size=CHUNK_SIZE):
+        self.sources = sources
+        self.chunk_size = chunk_size
+        self.errors = []
+        self.known_ids = {}
+        self.seen = {}
+
+    def add_errors(self, table, frame, column, mask, message):
+        mask = np.asarray(mask, dtype=bool)
+        if not mask.any():
+            return
+        self.errors.append(pd.DataFrame({
+            'file': table.name,
+            'row': frame.index[mask] + 1,
+            'column': column,
+            'value': frame[column][mask].values,
+            'error': message,
+        }))
+
+    def get_known_ids(self, model):
+        """Первичные ключи модели из файлов набора и из БД."""
+        if model not in self.known_ids:
+            ids = [np.fromiter(
+                model.objects.order_by().values_list('id', flat=True),
+                dtype=np.int64,
+            )]
+            for table, path in self.sources:
+                if table.model is not model:
+                    continue
+                for chunk in read_chunks(path, ['id'], self.chunk_size):
+                    if 'id' in chunk.columns:
+                        ids.append(pd.to_numeric(
+                            chunk['id'], errors='coerce'
+                        ).dropna().to_numpy(dtype=np.int64))
+            self.known_ids[model] = np.unique(np.concatenate(ids))
+        return self.known_ids[model]
+
+    def check_field(self, table, frame, column, field):
+        values = frame[column]
+        present = values != ''
+        if not field.null and not field.blank:
+            self.add_errors(table, frame, column, ~present,
+                            'Обязательное поле не заполнено.')
+        if isinstance(field, (models.IntegerField, models.ForeignKey)):
+            self.check_numbers(table, frame, column, field, present)
+        elif isinstance(field, models.DateTimeField):
+            dates = pd.to_datetime(values, errors='coerce', utc=True)
+            self.add_errors(table, frame, column, present & dates.isna(),
+                            'Некорректная дата.')
+        else:
+            self.check_strings(table, frame, column, field, present)
+
+    def check_numbers(self, table, frame, column, field, present):
+        numbers = pd.to_numeric(frame[column], errors='coerce')
+        invalid = present & (numbers.isna() | (numbers % 1 != 0))
+        self.add_errors(table, frame, column, invalid,
+                        'Значение должно быть целым числом.')
+        valid = present & ~invalid
+        for validator in field.validators:
+            bounds = value_ranges().get(validator)
+            if bounds is not None:
+                self.add_errors(
+                    table, frame, column, valid & ~numbers.between(*bounds),
+                    f'Значение вне диапазона [{bounds[0]}:{bounds[1]}].'
+                )
+        if isinstance(field, models.ForeignKey):
+            known = self.get_known_ids(field.related_model)
+            self.add_errors(
+                table, frame, column, valid & ~numbers.isin(known),
+                f'Нет записи {field.related_model.__name__} с таким id.'
+            )
+
+    def check_strings(self, table, frame, column, field, present):
+        values = frame[column]
+        if isinstance(field, models.CharField) and field.max_length:
+            self.add_errors(
+                table, frame, column, values.str.len() > field.max_length,
+                f'Длина больше {field.max_length} символов.'
+            )
+        if field.choices:
+            choices = [value for value, _ in field.choices]
+            self.add_errors(table, frame, column,
+                            present & ~values.isin(choices),
+                            'Недопустимое значение.')
+        if isinstance(field, models.EmailField):
+            self.add_errors(
+                table, frame, column,
+                present & ~values.str.fullmatch(r'[^@\s]+@[^@\s]+\.[^@\s]+'),
+                'Некорректный адрес электронной почты.'
+            )
+        for validator in field.validators:
+            if isinstance(validator, RegexValidator):
+                matches = values.str.contains(validator.regex, regex=True)
+                self.add_errors(
+                    table, frame, column,
+                    present & (matches == validator.inverse_match),
+                    str(validator.message)
+                )
+
+    def find_existing(self, table, frame, attnames, columns):
+        """
+        Записи БД с теми же значениями attnames, что и в порции.
+        Выбираются пачками по значениям первого столбца.
+        """
+        values = lookup_values(
+            table.model._meta.get_field(attnames[0]),
+            frame[columns[0]].unique().tolist(),
+        )
+        rows = []
+        for start in range(0, len(values), LOOKUP_BATCH_SIZE):
+            rows.extend(table.model.objects.order_by().filter(**{
+                f'{attnames[0]}__in': values[start:start + LOOKUP_BATCH_SIZE]
+            }).values_list('id', *attnames))
+        return pd.DataFrame(rows, columns=['db_id', *columns]).astype(str)
+
+    def check_unique(self, table, frame, attnames):
+        """
+        Уникальность значений (или их сочетаний) в файле и в БД.
+        Повтор в файле отмечается у второй и следующих строк.
+        """
+        column_names = {
+            attname: column for column, attname in table.columns
+            if column in frame.columns
+        }
+        if not all(attname in column_names for attname in attnames):
+            return
+        columns = [column_names[attname] for attname in attnames]
+        label = ', '.join(columns)
+        key = (table.name, tuple(attnames))
+        seen = self.seen.get(key, np.array([], dtype=np.uint64))
+        hashes = row_hashes(frame, columns)
+        self.add_errors(
+            table, frame, columns[0],
+            pd.Series(hashes).duplicated().to_numpy()
+            | np.isin(hashes, seen),
+            f'Повторяющееся значение ({label}) в файле.'
+        )
+        self.seen[key] = np.union1d(seen, hashes)
+        existing = self.find_existing(table, frame, attnames, columns)
+        if existing.empty:
+            return
+        merged = frame.reset_index().merge(existing, on=columns, how='inner')
+        clashes = merged[merged['id'] != merged['db_id']]['index']
+        self.add_errors(
+            table, frame, columns[0], frame.index.isin(clashes),
+            f'Значение ({label}) уже занято другой записью в БД.'
+        )
+
+    def unique_sets(self, table, present):
+        """Наборы атрибутов, значения которых должны быть уникальны."""
+        meta = table.model._meta
+        for _, attname in present:
+            if meta.get_field(attname).unique:
+                yield [attname]
+        for constraint in meta.constraints:
+            if isinstance(constraint, models.UniqueConstraint):
+                yield [
+                    meta.get_field(name).attname for name in constraint.fields
+                ]
+        for fields in meta.unique_together:
+            yield [meta.get_field(name).attname for name in fields]
+
+    def check_chunk(self, table, frame, present):
+        for column, attname in present:
+            field = table.model._meta.get_field(attname)
+            if not field.primary_key:
+                self.check_field(table, frame, column, field)
+        for attnames in self.unique_sets(table, present):
+            self.check_unique(table, frame, attnames)
+        ids = pd.to_numeric(frame['id'], errors='coerce')
+        self.add_errors(table, frame, 'id', ids.isna(),
+                        'Значение должно быть целым числом.')
+
+    def check_table(self, table, path):
+        columns = [column for column, _ in table.columns]
+        for frame in read_chunks(path, columns, self.chunk_size):
+            present, missing = present_columns(table, frame.columns)
+            if missing:
+                self.errors.append(pd.DataFrame({
+                    'file': table.name,
+                    'row': 0,
+                    'column': missing,
+                    'value': '',
+                    'error': 'Нет обязательного столбца в файле.',
+                }))
+                return
+            self.check_chunk(table, frame, present)
+
+    def run(self):
+        """Проверяет все файлы и возвращает отчёт об ошибках."""
+        for table, path in self.sources:
+            self.check_table(table, path)
+        if not self.errors:
+            return pd.DataFrame(columns=REPORT_COLUMNS)
+        return pd.concat(self.errors, ignore_index=True).sort_values(
+            ['file', 'row'], kind='stable'
+        )
@@ -1,9 +1,18 @@
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 
+SCORE_MIN = 0
+SCORE_MAX = 10
+YEAR_MIN = 0
+
+
+def max_year():
+    """Наибольший допустимый год выпуска — текущий."""
+    return timezone.now().year
+
 
 def year_validator(value):
-    if value < 0 or value > timezone.now().year:
+    if value < YEAR_MIN or value > max_year():
         raise ValidationError(
             ('%(value)s - некорректный год!'),
             params={'value': value},
@@ -11,8 +20,9 @@ def year_validator(value):
 
 
 def score_validator(value):
-    if value < 0 or value > 10:
+    if value < SCORE_MIN or value > SCORE_MAX:
         raise ValidationError(
-            ('Значение должно находиться в диапазоне [0:10]'),
+            (f'Значение должно находиться в диапазоне '
+             f'[{SCORE_MIN}:{SCORE_MAX}]'),
             params={'value': value},
         )
@@ -139,3 +139,38 @@ class Test02CategoryAPI:
                           HTTPStatus.FORBIDDEN)
         check_permissions(moderator_client, url, data, 'модератора',
                           categories, HTTPStatus.FORBIDDEN)
+
+    def test_06_category_list_cache(self, client, admin_client):
+        url = '/api/v1/categories/'
+        stats_url = '/api/v1/cache-stats/'
+        stats_before = admin_client.get(stats_url).json()['category']
+        categories = create_categories(admin_client)
+        assert client.get(url)['X-Cache'] == 'MISS'
+        response = client.get(url)
+        assert response['X-Cache'] == 'HIT', (
+            f'Проверьте, что повторный GET-запрос к `{url}` обслуживается '
+            'из кэша.'
+        )
+        assert response.json()['count'] == len(categories)
+        assert client.get(f'{url}?search=Фильм')['X-Cache'] == 'MISS', (
+            'Проверьте, что ключ кэша учитывает строку поиска.'
+        )
+
+        admin_client.delete(f'{url}{categories[0]["slug"]}/')
+        response = client.get(url)
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['count'] == len(categories) - 1, (
+            f'Проверьте, что кэш `{url}` сбрасывается при удалении категории.'
+        )
+
+        response = admin_client.get(stats_url)
+        assert response.status_code == HTTPStatus.OK
+        stats = response.json()['category']
+        assert stats['hits'] - stats_before['hits'] == 1, (
+            f'Проверьте, что `{stats_url}` считает попадания в кэш.'
+        )
+        assert stats['misses'] - stats_before['misses'] == 3, (
+            f'Проверьте, что `{stats_url}` считает промахи кэша.'
+        )
+        response = client.get(stats_url)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
@@ -316,3 +316,39 @@ class Test04TitleAPI:
                           HTTPStatus.FORBIDDEN)
         check_permissions(moderator_client, url, data, 'модератора',
                           titles, HTTPStatus.FORBIDDEN)
+
+    def test_06_titles_slug_filters(self, client, admin_client):
+        titles, categories, genres = create_titles(admin_client)
+        url = '/api/v1/titles/'
+
+        def filtered_ids(query):
+            response = client.get(f'{url}?{query}')
+            assert response.status_code == HTTPStatus.OK
+            return sorted(title['id'] for title in response.json()['results'])
+
+        all_ids = sorted(title['id'] for title in titles)
+        query = f'genre={genres[0]["slug"]},{genres[2]["slug"]}'
+        assert filtered_ids(query) == all_ids, (
+            f'Проверьте, что фильтр `{query}` на `{url}` возвращает '
+            'произведения с любым из перечисленных жанров.'
+        )
+        query = f'genre={genres[0]["slug"]},{genres[1]["slug"]}'
+        assert filtered_ids(query) == [titles[0]['id']], (
+            f'Проверьте, что фильтр `{query}` на `{url}` возвращает '
+            'каждое произведение не более одного раза.'
+        )
+        assert filtered_ids(query + '&genre_match=all') == [titles[0]['id']]
+        query = f'genre={genres[0]["slug"]},{genres[2]["slug"]}'
+        assert filtered_ids(query + '&genre_match=all') == [], (
+            f'Проверьте, что фильтр `{query}&genre_match=all` на `{url}` '
+            'возвращает только произведения со всеми перечисленными жанрами.'
+        )
+        assert filtered_ids(f'genre={genres[0]["slug"][:-1]}') == [], (
+            f'Проверьте, что фильтр по жанру на `{url}` сравнивает слаг '
+            'целиком.'
+        )
+        query = f'category={categories[0]["slug"]},{categories[1]["slug"]}'
+        assert filtered_ids(query) == all_ids
+        assert filtered_ids(f'category={categories[1]["slug"]}') == [
+            titles[1]['id']
+        ]
@@ -0,0 +1,68 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08RatingAggregates:
+
+    def get_rating(self, client, title_id):
+        response = client.get(f'/api/v1/titles/{title_id}/')
+        assert response.status_code == HTTPStatus.OK
+        return response.json().get('rating')
+
+    def test_01_rating_follows_review_writes(self, admin_client, admin, user,
+                                             user_client):
+        author_map = {admin: admin_client, user: user_client}
+        reviews, titles = create_reviews(admin_client, author_map)
+        title_id = titles[0]['id']
+        url = f'/api/v1/titles/{title_id}/reviews/'
+        assert self.get_rating(admin_client, title_id) == 5, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            f'создании отзыва через POST-запрос к `{url}`.'
+        )
+
+        response = user_client.patch(
+            f'{url}{reviews[1]["id"]}/', data={'score': 10}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert self.get_rating(admin_client, title_id) == 7, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            f'изменении оценки через PATCH-запрос к `{url}<review_id>/`.'
+        )
+
+        response = admin_client.delete(f'{url}{reviews[0]["id"]}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert self.get_rating(admin_client, title_id) == 10, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            f'удалении отзыва через DELETE-запрос к `{url}<review_id>/`.'
+        )
+
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert self.get_rating(admin_client, title_id) is None, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'удалении пользователя вместе с его отзывами.'
+        )
+
+    def test_02_rebuild_ratings_fixes_drift(self, admin_client, admin, user,
+                                            user_client):
+        from reviews.models import Title
+
+        author_map = {admin: admin_client, user: user_client}
+        _, titles = create_reviews(admin_client, author_map)
+        Title.objects.update(score_sum=0, reviews_count=0)
+
+        call_command('rebuild_ratings', '--dry-run')
+        assert self.get_rating(admin_client, titles[0]['id']) is None, (
+            'Команда `rebuild_ratings --dry-run` не должна изменять данные.'
+        )
+
+        call_command('rebuild_ratings')
+        assert self.get_rating(admin_client, titles[0]['id']) == 5, (
+            'Проверьте, что команда `rebuild_ratings` восстанавливает '
+            'агрегаты оценок произведений.'
+        )
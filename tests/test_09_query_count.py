@@ -0,0 +1,115 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_titles
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(context.captured_queries)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09QueryCount:
+
+    def add_titles(self, amount):
+        from reviews.models import Category, Genre, Title
+
+        category = Category.objects.first()
+        genres = list(Genre.objects.all())
+        for idx in range(amount):
+            title = Title.objects.create(
+                name=f'Произведение {idx}', year=2000, category=category
+            )
+            title.genre.set(genres)
+
+    def test_01_title_list_constant_queries(self, client, admin_client):
+        create_titles(admin_client)
+        url = '/api/v1/titles/'
+        small = count_queries(client, url)
+        self.add_titles(8)
+        large = count_queries(client, url)
+        assert small == large, (
+            f'Проверьте, что GET-запрос к `{url}` выполняет постоянное '
+            'количество запросов к БД вне зависимости от числа произведений '
+            f'и жанров: было {small}, стало {large}.'
+        )
+        assert large <= 3, (
+            f'Проверьте, что при GET-запросе к `{url}` категории и жанры '
+            'загружаются вместе с произведениями, а не отдельным запросом '
+            'на каждое произведение.'
+        )
+
+    def test_02_title_detail_constant_queries(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        assert count_queries(client, url) <= 2, (
+            f'Проверьте, что GET-запрос к `{url}` загружает категорию и '
+            'жанры произведения без дополнительных запросов к БД.'
+        )
+
+    def test_03_review_and_comment_lists_constant_queries(
+        self, client, admin_client, django_user_model
+    ):
+        from reviews.models import Comment, Review
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        authors = [
+            django_user_model.objects.create_user(
+                username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+            )
+            for idx in range(6)
+        ]
+        review = Review.objects.create(
+            title_id=title_id, author=authors[0], text='text', score=5
+        )
+        Comment.objects.create(review=review, author=authors[0], text='text')
+        review_url = f'/api/v1/titles/{title_id}/reviews/'
+        comment_url = f'{review_url}{review.id}/comments/'
+        small = (
+            count_queries(client, review_url),
+            count_queries(client, comment_url),
+        )
+        for author in authors[1:]:
+            Review.objects.create(
+                title_id=title_id, author=author, text='text', score=5
+            )
+            Comment.objects.create(review=review, author=author, text='text')
+        large = (
+            count_queries(client, review_url),
+            count_queries(client, comment_url),
+        )
+        assert small == large, (
+            'Проверьте, что GET-запросы к спискам отзывов и комментариев '
+            'загружают авторов вместе с объектами и выполняют постоянное '
+            f'количество запросов к БД: было {small}, стало {large}.'
+        )
+
+    def test_04_nested_routes_resolve_parent_once(self, client, admin_client,
+                                                  admin):
+        from reviews.models import Comment, Review
+
+        titles, _, _ = create_titles(admin_client)
+        review = Review.objects.create(
+            title_id=titles[0]['id'], author=admin, text='text', score=5
+        )
+        Comment.objects.create(review=review, author=admin, text='text')
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{review.id}/comments/'
+        queries = count_queries(client, url)
+        assert queries <= 3, (
+            f'Проверьте, что GET-запрос к `{url}` получает отзыв и '
+            'произведение одним запросом к БД.'
+        )
+
+        url = f'/api/v1/titles/{titles[1]["id"]}/reviews/{review.id}/comments/'
+        response = client.get(url)
+        assert response.status_code == 404, (
+            'Проверьте, что GET-запрос к '
+            '`/api/v1/titles/{title_id}/reviews/{review_id}/comments/` '
+            'возвращает ответ со статусом 404, если отзыв не относится к '
+            'произведению из URL.'
+        )
@@ -0,0 +1,118 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10Pagination:
+
+    def create_reviews(self, title_id, amount, django_user_model):
+        from reviews.models import Review
+
+        return [
+            Review.objects.create(
+                title_id=title_id,
+                author=django_user_model.objects.create_user(
+                    username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+                ),
+                text=f'review {idx}',
+                score=5,
+            )
+            for idx in range(amount)
+        ]
+
+    def test_01_review_cursor_pagination(self, client, admin_client,
+                                         django_user_model):
+        titles, _, _ = create_titles(admin_client)
+        reviews = self.create_reviews(titles[0]['id'], 25, django_user_model)
+        expected = [review.id for review in reversed(reviews)]
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/?pagination=cursor'
+
+        collected = []
+        pages = []
+        while url:
+            with CaptureQueriesContext(connection) as context:
+                response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            data = response.json()
+            assert 'count' not in data, (
+                'Проверьте, что в режиме курсора ответ не содержит `count` '
+                'и общее количество отзывов не подсчитывается.'
+            )
+            assert not any(
+                'COUNT(' in query['sql'] or 'OFFSET' in query['sql']
+                for query in context.captured_queries
+            ), 'Режим курсора не должен использовать COUNT и OFFSET.'
+            collected.extend(item['id'] for item in data['results'])
+            pages.append(url)
+            url = data['next']
+        assert collected == expected, (
+            'Проверьте, что при переходе по ссылкам `next` в режиме курсора '
+            'отзывы возвращаются по одному разу, от новых к старым.'
+        )
+
+        response = client.get(pages[-1])
+        previous = response.json()['previous']
+        response = client.get(previous)
+        assert [item['id'] for item in response.json()['results']] == (
+            expected[10:20]
+        ), 'Проверьте, что ссылка `previous` ведёт на предыдущую страницу.'
+
+    def test_02_page_number_pagination_is_default(self, client, admin_client,
+                                                  django_user_model):
+        titles, _, _ = create_titles(admin_client)
+        self.create_reviews(titles[0]['id'], 3, django_user_model)
+        response = client.get(f'/api/v1/titles/{titles[0]["id"]}/reviews/')
+        assert response.json()['count'] == 3
+
+        response = client.get(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/?cursor=broken'
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что для некорректного курсора возвращается ответ '
+            'со статусом 404.'
+        )
+
+    def test_03_optional_count(self, client, admin_client):
+        create_titles(admin_client)
+        url = '/api/v1/titles/?count=false'
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        data = response.json()
+        assert data['count'] is None and len(data['results']) == 2, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает страницу '
+            'с ключом `count`, равным None.'
+        )
+        assert not any(
+            'COUNT(' in query['sql'] for query in context.captured_queries
+        ), f'Проверьте, что GET-запрос к `{url}` не подсчитывает объекты.'
+
+    def test_04_cached_count_invalidated_on_write(self, client,
+                                                  admin_client):
+        titles, categories, genres = create_titles(admin_client)
+        url = f'/api/v1/titles/?genre={genres[0]["slug"]}'
+        assert client.get(url).json()['count'] == 1
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.json()['count'] == 1
+        assert not any(
+            'COUNT(' in query['sql'] for query in context.captured_queries
+        ), (
+            f'Проверьте, что при повторном GET-запросе к `{url}` количество '
+            'объектов берётся из кэша.'
+        )
+
+        admin_client.post('/api/v1/titles/', data={
+            'name': 'Чужой',
+            'year': 1979,
+            'genre': [genres[0]['slug']],
+            'category': categories[0]['slug'],
+        })
+        assert client.get(url).json()['count'] == 2, (
+            'Проверьте, что закэшированное количество объектов '
+            'сбрасывается при записи в таблицу.'
+        )
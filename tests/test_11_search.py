@@ -0,0 +1,88 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_categories, create_genre
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11TitleSearch:
+
+    def create_title(self, admin_client, name, description):
+        response = admin_client.post('/api/v1/titles/', data={
+            'name': name,
+            'year': 2000,
+            'genre': ['drama'],
+            'category': 'films',
+            'description': description,
+        })
+        assert response.status_code == HTTPStatus.CREATED
+        return response.json()['id']
+
+    def search(self, client, value):
+        response = client.get('/api/v1/titles/', {'search': value})
+        assert response.status_code == HTTPStatus.OK
+        return [title['id'] for title in response.json()['results']]
+
+    def test_01_search_folds_case_and_ranks(self, client, admin_client):
+        create_genre(admin_client)
+        create_categories(admin_client)
+        in_description = self.create_title(
+            admin_client, 'Зелёная миля', 'Надзиратель тюрьмы и ПОБЕГ.'
+        )
+        in_name = self.create_title(
+            admin_client, 'Побег из Шоушенка', 'Банкир попадает в тюрьму.'
+        )
+        self.create_title(admin_client, 'Форрест Гамп', 'Беги, Форрест!')
+
+        assert self.search(client, 'побег') == [in_name, in_description], (
+            'Проверьте, что параметр `search` на `/api/v1/titles/` ищет '
+            'без учёта регистра кириллицы и ставит совпадения в названии '
+            'выше совпадений в описании.'
+        )
+        assert self.search(client, 'тюрьм') == [in_description, in_name], (
+            'Проверьте, что параметр `search` ищет слова по префиксу.'
+        )
+        assert self.search(client, 'шоушенк банкир') == [in_name]
+
+    def test_02_search_index_follows_writes(self, client, admin_client):
+        create_genre(admin_client)
+        create_categories(admin_client)
+        title_id = self.create_title(admin_client, 'Крёстный отец', '')
+        admin_client.patch(
+            f'/api/v1/titles/{title_id}/', data={'name': 'Однажды в Америке'}
+        )
+        assert self.search(client, 'крёстный') == []
+        assert self.search(client, 'америке') == [title_id], (
+            'Проверьте, что поисковый индекс обновляется при изменении '
+            'произведения.'
+        )
+        admin_client.delete(f'/api/v1/titles/{title_id}/')
+        assert self.search(client, 'америке') == [], (
+            'Проверьте, что поисковый индекс обновляется при удалении '
+            'произведения.'
+        )
+
+    def test_03_many_matches_run_one_fulltext_search(self, client):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from reviews.models import Title
+
+        Title.objects.bulk_create(
+            Title(name=f'Фильм {number}', year=2000)
+            for number in range(3000)
+        )
+        with CaptureQueriesContext(connection) as context:
+            results = self.search(client, 'фильм')
+        assert len(results) == 10 and results == sorted(results)
+        searches = [
+            query['sql'] for query in context.captured_queries
+            if 'reviews_title_fts' in query['sql']
+        ]
+        assert searches and all(
+            sql.count('MATCH') == 1 for sql in searches
+        ), (
+            'Проверьте, что поиск выполняет полнотекстовый MATCH один раз '
+            'на запрос, а не на каждое найденное произведение: '
+            f'{searches}'
+        )
@@ -0,0 +1,114 @@
+import shutil
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.test_13_import import DATA_DIR
+from tests.utils import create_reviews, create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12ConditionalGet:
+
+    def check_not_modified(self, client, url):
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        etag = response['ETag']
+        assert etag and response['Last-Modified'], (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+            'заголовки `ETag` и `Last-Modified`.'
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url}` с заголовком '
+            '`If-None-Match` возвращает 304, если данные не менялись.'
+        )
+        assert not context.captured_queries, (
+            f'Проверьте, что ответ 304 на `{url}` не выполняет запросов к БД.'
+        )
+        return etag
+
+    def test_01_catalog_conditional_get(self, client, admin_client):
+        titles, categories, genres = create_titles(admin_client)
+        for url in ('/api/v1/titles/', f'/api/v1/titles/{titles[0]["id"]}/',
+                    '/api/v1/categories/', '/api/v1/genres/'):
+            self.check_not_modified(client, url)
+
+        url = '/api/v1/genres/'
+        etag = self.check_not_modified(client, url)
+        admin_client.post(url, data={'name': 'Вестерн', 'slug': 'western'})
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что после записи ETag ответа `{url}` меняется.'
+        )
+
+        response = client.get(url)
+        response = client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что `If-Modified-Since` не учитывается: у даты '
+            'точность в секунду, запись в ту же секунду осталась бы '
+            'незамеченной.'
+        )
+
+    def test_02_review_conditional_get(self, client, admin_client, admin,
+                                       user, user_client):
+        reviews, titles = create_reviews(admin_client, {admin: admin_client})
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        other_url = f'/api/v1/titles/{titles[1]["id"]}/reviews/'
+        etag = self.check_not_modified(client, url)
+        other_etag = self.check_not_modified(client, other_url)
+
+        create_single_review(user_client, titles[0]['id'], 'text', 7)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что после нового отзыва ETag ответа `{url}` '
+            'меняется.'
+        )
+        assert response.json()['count'] == 2
+        response = client.get(other_url, HTTP_IF_NONE_MATCH=other_etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что версия отзывов ведётся отдельно для каждого '
+            'произведения.'
+        )
+
+    def test_03_review_versions_follow_import(self, client, admin,
+                                              tmp_path):
+        from reviews.models import Review
+        from reviews.ratings import apply_score_change
+
+        data_dir = tmp_path / 'data'
+        shutil.copytree(DATA_DIR, data_dir)
+        call_command('read_csv_files', '--data-dir', data_dir)
+        url = '/api/v1/titles/1/reviews/'
+        etag = self.check_not_modified(client, url)
+
+        reviews = (data_dir / 'review.csv').read_text(encoding='utf-8')
+        (data_dir / 'review.csv').write_text(
+            reviews.replace('Ставлю десять звёзд!', 'Ставлю девять звёзд!'),
+            encoding='utf-8',
+        )
+        call_command(
+            'read_csv_files', '--data-dir', data_dir, '--incremental'
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после импорта отзывов ETag списка отзывов '
+            'произведения меняется.'
+        )
+
+        etag = response['ETag']
+        Review.objects.bulk_create([Review(
+            title_id=1, author=admin, text='bulk', score=5,
+        )])
+        apply_score_change(1, 5, 1)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что `apply_score_change` сдвигает версию отзывов '
+            'произведения.'
+        )
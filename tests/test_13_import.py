@@ -0,0 +1,355 @@
+import os
+import shutil
+
+import pytest
+from django.core.management import call_command
+
+from tests.conftest import MANAGE_PATH
+
+DATA_DIR = os.path.join(MANAGE_PATH, 'static', 'data')
+
+
+def append_rows(path, *rows):
+    content = path.read_text(encoding='utf-8').rstrip('\n')
+    path.write_text('\n'.join((content, *rows)) + '\n', encoding='utf-8')
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13CsvImport:
+
+    def test_01_import_bundled_data(self, client):
+        call_command(
+            'read_csv_files', '--data-dir', DATA_DIR, '--chunk-size', '7'
+        )
+
+        response = client.get('/api/v1/titles/1/')
+        assert response.status_code == 200
+        title = response.json()
+        assert title['genre'], (
+            'Проверьте, что команда `read_csv_files` загружает связи '
+            'произведений с жанрами из `genre_title.csv`.'
+        )
+        assert title['rating'] is not None, (
+            'Проверьте, что после импорта отзывов рейтинг произведений '
+            'пересчитывается.'
+        )
+        response = client.get('/api/v1/titles/1/reviews/')
+        review = response.json()['results'][-1]
+        assert review['pub_date'].startswith('2019-09-24T21:08:21'), (
+            'Проверьте, что при импорте сохраняется дата отзыва из файла.'
+        )
+
+    def test_02_import_all_rows(self, client):
+        from reviews.models import Comment, Review, Title
+
+        call_command(
+            'read_csv_files', '--data-dir', DATA_DIR, '--chunk-size', '5'
+        )
+        assert (
+            Title.objects.count(),
+            Title.genre.through.objects.count(),
+            Review.objects.count(),
+            Comment.objects.count(),
+        ) == (32, 42, 72, 3), (
+            'Проверьте, что команда `read_csv_files` загружает '
+            'все строки всех файлов.'
+        )
+
+    def test_03_incremental_import(self, client, tmp_path):
+        from reviews.models import Category, Comment, Genre
+
+        data_dir = tmp_path / 'data'
+        shutil.copytree(DATA_DIR, data_dir)
+        call_command('read_csv_files', '--data-dir', data_dir)
+
+        category = (data_dir / 'category.csv').read_text(encoding='utf-8')
+        (data_dir / 'category.csv').write_text(
+            category.replace('Фильм', 'Кино'), encoding='utf-8'
+        )
+        append_rows(data_dir / 'genre.csv', '100,Нуар,noir')
+        comments = (data_dir / 'comments.csv').read_text(encoding='utf-8')
+        lines = comments.splitlines(keepends=True)
+        (data_dir / 'comments.csv').write_text(
+            ''.join(lines[:-1]), encoding='utf-8'
+        )
+
+        call_command(
+            'read_csv_files', '--data-dir', data_dir, '--incremental'
+        )
+        assert Category.objects.get(id=1).name == 'Кино', (
+            'Проверьте, что `read_csv_files --incremental` обновляет '
+            'изменённые строки.'
+        )
+        assert Genre.objects.filter(slug='noir').exists(), (
+            'Проверьте, что `read_csv_files --incremental` добавляет '
+            'новые строки.'
+        )
+        assert Comment.objects.count() == 2, (
+            'Проверьте, что `read_csv_files --incremental` удаляет строки, '
+            'которых больше нет в файле.'
+        )
+
+        call_command(
+            'read_csv_files', '--data-dir', data_dir, '--incremental'
+        )
+        assert client.get('/api/v1/titles/1/').json()['rating'] is not None
+
+    def test_04_dry_run_report(self, tmp_path):
+        import pandas as pd
+        from django.core.management.base import CommandError
+        from reviews.models import Genre, Review
+
+        report_path = tmp_path / 'report.csv'
+        call_command(
+            'read_csv_files', '--data-dir', DATA_DIR,
+            '--dry-run', '--report', report_path,
+        )
+        assert pd.read_csv(report_path).empty, (
+            'Проверьте, что `read_csv_files --dry-run` не находит ошибок '
+            'в корректных данных.'
+        )
+
+        data_dir = tmp_path / 'data'
+        shutil.copytree(DATA_DIR, data_dir)
+        append_rows(data_dir / 'genre.csv', '100,Ещё сказка,tale')
+        append_rows(
+            data_dir / 'review.csv',
+            '1000,1,Плохо,1,11,2019-09-24T21:08:21.567Z',
+            '1001,1,Кто я,999,5,2019-09-24T21:08:21.567Z',
+        )
+
+        with pytest.raises(CommandError):
+            call_command(
+                'read_csv_files', '--data-dir', data_dir, '--chunk-size', '3',
+                '--dry-run', '--report', report_path,
+            )
+        report = pd.read_csv(report_path)
+        errors = set(zip(report['file'], report['column'], report['value']))
+        assert ('genre', 'slug', 'tale') in errors, (
+            'Проверьте, что `read_csv_files --dry-run` сообщает '
+            'о повторяющихся slug, в том числе в разных порциях файла.'
+        )
+        assert ('review', 'score', '11') in errors, (
+            'Проверьте, что `read_csv_files --dry-run` сообщает '
+            'об оценке вне диапазона.'
+        )
+        assert ('review', 'author', '999') in errors, (
+            'Проверьте, что `read_csv_files --dry-run` сообщает '
+            'о ссылках на несуществующих авторов.'
+        )
+        assert not Genre.objects.exists() and not Review.objects.exists(), (
+            'Проверьте, что `read_csv_files --dry-run` не записывает '
+            'данные в БД.'
+        )
+
+    def test_05_compressed_sources(self, tmp_path):
+        import bz2
+        import gzip
+        import lzma
+        import zipfile
+
+        from reviews.models import Comment, Review, Title
+
+        compressors = {
+            'titles': ('.csv.gz', gzip.compress),
+            'review': ('.csv.bz2', bz2.compress),
+            'comments': ('.csv.xz', lzma.compress),
+        }
+        data_dir = tmp_path / 'data'
+        data_dir.mkdir()
+        bundle_path = tmp_path / 'bundle.zip'
+        with zipfile.ZipFile(bundle_path, 'w', zipfile.ZIP_DEFLATED) as bundle:
+            for name in sorted(os.listdir(DATA_DIR)):
+                content = open(os.path.join(DATA_DIR, name), 'rb').read()
+                bundle.writestr(f'data/{name}', content)
+                table = name[:-len('.csv')]
+                if table in compressors:
+                    suffix, compress = compressors[table]
+                    (data_dir / (table + suffix)).write_bytes(
+                        compress(content)
+                    )
+                elif table == 'genre_title':
+                    with zipfile.ZipFile(data_dir / f'{name}.zip', 'w') as zf:
+                        zf.writestr(name, content)
+                else:
+                    (data_dir / name).write_bytes(content)
+
+        for source in (data_dir, bundle_path):
+            call_command('read_csv_files', '--data-dir', source)
+            assert (
+                Title.objects.count(),
+                Title.genre.through.objects.count(),
+                Review.objects.count(),
+                Comment.objects.count(),
+            ) == (32, 42, 72, 3), (
+                'Проверьте, что команда `read_csv_files` читает файлы, '
+                'сжатые gzip, bzip2, xz и zip, и zip-архив со всем набором.'
+            )
+            call_command(
+                'read_csv_files', '--data-dir', source, '--incremental'
+            )
+            call_command('flush', '--no-input')
+
+    def test_06_export_round_trip(self, client, tmp_path):
+        import json
+
+        from django.utils import timezone
+
+        from reviews.models import Comment, Review, Title
+        from users.models import CustomUser
+
+        call_command('read_csv_files', '--data-dir', DATA_DIR)
+        Title.objects.filter(id=1).update(description='Описание')
+        user = CustomUser.objects.get(id=100)
+        user.set_password('secret-password')
+        user.is_staff = True
+        user.last_login = timezone.now()
+        user.save()
+        user_fields = (
+            'password', 'is_staff', 'is_superuser', 'is_active',
+            'date_joined', 'last_login', 'confirmation_code',
+        )
+        user_values = CustomUser.objects.values(*user_fields).get(id=100)
+        title = client.get('/api/v1/titles/1/').json()
+        reviews = client.get('/api/v1/titles/1/reviews/').json()
+        counts = (
+            Title.objects.count(),
+            Title.genre.through.objects.count(),
+            Review.objects.count(),
+            Comment.objects.count(),
+        )
+
+        export_dir = tmp_path / 'export'
+        call_command(
+            'export_csv_files', '--output-dir', export_dir,
+            '--gzip', '--chunk-size', '10',
+        )
+        call_command(
+            'export_csv_files', 'review', '--output-dir', tmp_path,
+            '--format', 'ndjson',
+        )
+        lines = (tmp_path / 'review.ndjson').read_text(
+            encoding='utf-8'
+        ).splitlines()
+        assert len(lines) == counts[2] and set(json.loads(lines[0])) == {
+            'id', 'title_id', 'text', 'author', 'score', 'pub_date'
+        }, (
+            'Проверьте, что `export_csv_files --format ndjson` выгружает '
+            'по одному объекту JSON на строку со столбцами набора.'
+        )
+
+        call_command('flush', '--no-input')
+        call_command('read_csv_files', '--data-dir', export_dir)
+        assert (
+            Title.objects.count(),
+            Title.genre.through.objects.count(),
+            Review.objects.count(),
+            Comment.objects.count(),
+        ) == counts, (
+            'Проверьте, что `read_csv_files` загружает все строки, '
+            'выгруженные `export_csv_files`.'
+        )
+        assert client.get('/api/v1/titles/1/').json() == title
+        assert title['description'] == 'Описание', (
+            'Проверьте, что `export_csv_files` и `read_csv_files` '
+            'переносят описание произведения.'
+        )
+        assert CustomUser.objects.values(*user_fields).get(
+            id=100
+        ) == user_values, (
+            'Проверьте, что `export_csv_files` и `read_csv_files` '
+            'переносят все поля пользователей.'
+        )
+        assert client.get('/api/v1/titles/1/reviews/').json() == reviews, (
+            'Проверьте, что `export_csv_files` сохраняет значения полей, '
+            'включая даты публикации.'
+        )
+
+    def test_07_incremental_cascade_rebuilds_ratings(self, tmp_path):
+        from reviews.models import Review
+        from reviews.ratings import rebuild_ratings
+
+        data_dir = tmp_path / 'data'
+        shutil.copytree(DATA_DIR, data_dir)
+        call_command('read_csv_files', '--data-dir', data_dir)
+        assert Review.objects.filter(author_id=100).exists()
+
+        users = (data_dir / 'users.csv').read_text(encoding='utf-8')
+        (data_dir / 'users.csv').write_text(
+            ''.join(
+                line for line in users.splitlines(keepends=True)
+                if not line.startswith('100,')
+            ),
+            encoding='utf-8',
+        )
+        call_command(
+            'read_csv_files', '--data-dir', data_dir, '--incremental'
+        )
+        assert not Review.objects.filter(author_id=100).exists()
+        assert rebuild_ratings(dry_run=True) == [], (
+            'Проверьте, что `read_csv_files --incremental` пересчитывает '
+            'рейтинг, когда удаление строк каскадом удаляет отзывы.'
+        )
+
+    def test_08_export_is_snapshot(self, monkeypatch, tmp_path):
+        from django.db import connection
+        from reviews import exporter
+
+        call_command('read_csv_files', '--data-dir', DATA_DIR)
+        export_table = exporter.export_table
+        transactions = []
+
+        def record_transaction(*args):
+            transactions.append(
+                (connection.in_atomic_block, connection.connection)
+            )
+            return export_table(*args)
+
+        monkeypatch.setattr(exporter, 'export_table', record_transaction)
+        call_command('export_csv_files', '--output-dir', tmp_path)
+        assert transactions and all(
+            in_atomic and db is transactions[0][1]
+            for in_atomic, db in transactions
+        ), (
+            'Проверьте, что `export_csv_files` читает все таблицы в одной '
+            'транзакции на одном соединении с БД.'
+        )
+
+    def test_09_parallel_parsing(self, tmp_path):
+        from reviews.models import Category, Comment, Review, Title
+
+        data_dir = tmp_path / 'data'
+        shutil.copytree(DATA_DIR, data_dir)
+        call_command(
+            'read_csv_files', '--data-dir', data_dir,
+            '--chunk-size', '5', '--workers', '2'
+        )
+        assert (
+            Title.objects.count(),
+            Title.genre.through.objects.count(),
+            Review.objects.count(),
+            Comment.objects.count(),
+        ) == (32, 42, 72, 3), (
+            'Проверьте, что при `--workers` команда `read_csv_files` '
+            'загружает все строки всех файлов.'
+        )
+
+        category = (data_dir / 'category.csv').read_text(encoding='utf-8')
+        (data_dir / 'category.csv').write_text(
+            category.replace('Фильм', 'Кино'), encoding='utf-8'
+        )
+        comments = (data_dir / 'comments.csv').read_text(encoding='utf-8')
+        (data_dir / 'comments.csv').write_text(
+            ''.join(comments.splitlines(keepends=True)[:-1]),
+            encoding='utf-8'
+        )
+        call_command(
+            'read_csv_files', '--data-dir', data_dir,
+            '--incremental', '--workers', '2'
+        )
+        assert (
+            Category.objects.get(id=1).name, Comment.objects.count()
+        ) == ('Кино', 2), (
+            'Проверьте, что `read_csv_files --incremental --workers` '
+            'обновляет и удаляет строки так же, как без `--workers`.'
+        )
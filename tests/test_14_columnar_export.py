@@ -0,0 +1,98 @@
+import os
+
+import numpy as np
+import pytest
+from django.core.management import call_command
+
+from tests.conftest import MANAGE_PATH
+
+DATA_DIR = os.path.join(MANAGE_PATH, 'static', 'data')
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14ColumnarExport:
+
+    def test_01_npy_export(self, tmp_path):
+        from reviews.models import Review, Title
+
+        call_command('read_csv_files', '--data-dir', DATA_DIR)
+        call_command(
+            'export_columns', '--output-dir', tmp_path,
+            '--format', 'npy', '--chunk-size', '10',
+        )
+
+        reviews_dir = tmp_path / 'reviews'
+        assert {path.name for path in reviews_dir.iterdir()} == {
+            'title_id.npy', 'author_id.npy', 'score.npy', 'pub_date.npy'
+        }, (
+            'Проверьте, что `export_columns` выгружает столбцы отзывов '
+            'title_id, author_id, score и pub_date в отдельные файлы .npy.'
+        )
+        reviews = {
+            path.stem: np.load(path, mmap_mode='r')
+            for path in reviews_dir.iterdir()
+        }
+        assert all(
+            isinstance(array, np.memmap) for array in reviews.values()
+        ), (
+            'Проверьте, что файлы `export_columns` открываются '
+            'с `mmap_mode`, без загрузки в память.'
+        )
+        assert len(reviews['score']) == Review.objects.count()
+        review = Review.objects.order_by('id').first()
+        assert (
+            reviews['title_id'][0], reviews['author_id'][0],
+            reviews['score'][0],
+        ) == (review.title_id, review.author_id, review.score)
+        assert reviews['pub_date'][0] == np.datetime64(
+            review.pub_date.replace(tzinfo=None)
+        ), 'Проверьте, что `export_columns` сохраняет дату отзыва.'
+
+        titles = {
+            path.stem: np.load(path, mmap_mode='r')
+            for path in (tmp_path / 'titles').iterdir()
+        }
+        offsets, genre_ids = titles['genre_offsets'], titles['genre_ids']
+        assert len(offsets) == len(titles['id']) + 1
+        assert offsets[-1] == len(genre_ids)
+        for index in (0, len(titles['id']) - 1):
+            title = Title.objects.get(id=titles['id'][index])
+            assert sorted(
+                genre_ids[offsets[index]:offsets[index + 1]]
+            ) == sorted(title.genre.values_list('id', flat=True)), (
+                'Проверьте, что `export_columns` выгружает жанры '
+                'произведений парой массивов genre_offsets/genre_ids.'
+            )
+            assert titles['category_id'][index] == title.category_id
+            assert titles['year'][index] == title.year
+
+    def test_02_parquet_export(self, tmp_path):
+        parquet = pytest.importorskip('pyarrow.parquet')
+        from reviews.models import Review, Title
+
+        call_command('read_csv_files', '--data-dir', DATA_DIR)
+        call_command(
+            'export_columns', '--output-dir', tmp_path,
+            '--format', 'parquet', '--chunk-size', '10',
+        )
+
+        reviews = parquet.read_table(tmp_path / 'reviews.parquet')
+        assert reviews.column_names == [
+            'title_id', 'author_id', 'score', 'pub_date'
+        ]
+        assert reviews.num_rows == Review.objects.count()
+        assert parquet.ParquetFile(
+            tmp_path / 'reviews.parquet'
+        ).num_row_groups > 1, (
+            'Проверьте, что `export_columns` пишет Parquet группами строк '
+            'по `--chunk-size`.'
+        )
+        titles = parquet.read_table(tmp_path / 'titles.parquet').to_pydict()
+        title = Title.objects.get(id=titles['id'][0])
+        assert sorted(titles['genre_ids'][0]) == sorted(
+            title.genre.values_list('id', flat=True)
+        ), (
+            'Проверьте, что `export_columns` выгружает жанры произведений '
+            'столбцом списков genre_ids.'
+        )
+        assert titles['category_id'][0] == title.category_id
@@ -0,0 +1,98 @@
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15Benchmark:
+
+    def test_01_run_benchmark(self):
+        from api.benchmark import compare, run_benchmark
+
+        call_command(
+            'generate_dataset', '--users', '30', '--titles', '10',
+            '--reviews', '100', '--comments-per-review', '2',
+        )
+        results = run_benchmark(repeat=2, warmup=0)
+        for name, stats in results.items():
+            assert stats['status'] in (200, 201), (
+                f'Проверьте, что сценарий замера `{name}` выполняется '
+                f'успешно, получен статус {stats["status"]}.'
+            )
+            assert stats['queries'] > 0 and stats['p95_ms'] > 0, (
+                f'Проверьте, что для сценария `{name}` замеряются '
+                'SQL-запросы и время.'
+            )
+        assert results['titles-list']['serialize_ms'] > 0, (
+            'Проверьте, что замеряется время сериализации.'
+        )
+
+        baseline = {'100': results}
+        assert compare({'100': results}, baseline) == []
+        slower = {
+            name: dict(stats, queries=stats['queries'] + 1)
+            for name, stats in results.items()
+        }
+        assert len(compare({'100': slower}, baseline)) == len(results), (
+            'Проверьте, что рост числа SQL-запросов относительно эталона '
+            'считается регрессией.'
+        )
+        slower = {
+            name: dict(stats, p50_ms=stats['p50_ms'] * 10 + 10)
+            for name, stats in results.items()
+        }
+        assert compare({'100': slower}, baseline) == [], (
+            'Проверьте, что время по умолчанию не сравнивается: эталон '
+            'мог быть снят на другой машине.'
+        )
+        assert len(
+            compare({'100': slower}, baseline, timings=True)
+        ) == len(results), (
+            'Проверьте, что с `timings` рост медианы времени считается '
+            'регрессией.'
+        )
+
+    def test_02_restores_test_database_name(self, monkeypatch, tmp_path):
+        from django.db import connection
+        from api.management.commands import benchmark_api
+
+        def fail(*args, **kwargs):
+            raise RuntimeError('create_test_db')
+
+        # pytest-django уже подготовил тестовое окружение.
+        for name in ('setup_test_environment', 'teardown_test_environment'):
+            monkeypatch.setattr(benchmark_api, name, lambda: None)
+        test_name = connection.settings_dict['TEST'].get('NAME')
+        monkeypatch.setattr(connection.creation, 'create_test_db', fail)
+        with pytest.raises(RuntimeError, match='create_test_db'):
+            call_command(
+                'benchmark_api', '--scales', '10',
+                '--output', tmp_path / 'benchmark.json',
+            )
+        assert connection.settings_dict['TEST'].get('NAME') == test_name, (
+            'Проверьте, что `benchmark_api` восстанавливает имя тестовой '
+            'БД в настройках соединения.'
+        )
+
+    def test_03_nplusone_detection_off(self, monkeypatch, settings,
+                                       tmp_path):
+        from django.conf import settings as django_settings
+        from api.management.commands import benchmark_api
+
+        detection = []
+
+        def run_scale(self, reviews, options, tmp_dir):
+            detection.append(django_settings.NPLUSONE_DETECTION)
+            return {}
+
+        for name in ('setup_test_environment', 'teardown_test_environment'):
+            monkeypatch.setattr(benchmark_api, name, lambda: None)
+        monkeypatch.setattr(benchmark_api.Command, 'run_scale', run_scale)
+        settings.NPLUSONE_DETECTION = 'raise'
+        call_command(
+            'benchmark_api', '--scales', '10', '--baseline', '',
+            '--output', tmp_path / 'benchmark.json',
+        )
+        assert detection == [None], (
+            'Проверьте, что `benchmark_api` выключает поиск N+1 на время '
+            'замеров.'
+        )
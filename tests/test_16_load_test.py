@@ -0,0 +1,103 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from django.core.management import call_command
+
+from tests.conftest import MANAGE_PATH
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16LoadTest:
+
+    def test_01_load_test_report(self, live_server, tmp_path):
+        call_command(
+            'generate_dataset', '--users', '30', '--titles', '10',
+            '--reviews', '100', '--comments-per-review', '2',
+        )
+        output = tmp_path / 'load.json'
+        call_command(
+            'load_test', '--url', live_server.url, '--threads', '2',
+            '--duration', '1', '--output', output,
+        )
+        report = json.loads(output.read_text(encoding='utf-8'))
+        assert {'titles-list', 'title-detail', '*'} <= set(report), (
+            'Проверьте, что `load_test` выдаёт сводку по эндпоинтам '
+            'и общую сводку.'
+        )
+        assert report['*']['requests'] > 0
+        assert set(report['*']) >= {
+            'rps', 'error_rate', 'errors', 'p50_ms', 'p95_ms', 'p99_ms'
+        }, (
+            'Проверьте, что сводка `load_test` содержит пропускную '
+            'способность, ошибки и перцентили времени ответа.'
+        )
+
+    def test_02_signup_needs_local_server(self, live_server):
+        from django.core.management.base import CommandError
+
+        with pytest.raises(CommandError, match='signup'):
+            call_command(
+                'load_test', '--url', live_server.url,
+                '--mix', 'browse=1,signup=1', '--duration', '1',
+            )
+
+    def test_03_server_errors_by_kind(self, rf):
+        from django.db import OperationalError
+        from django.http import HttpResponseServerError
+
+        from api.loadtest import (LOCKED_ERROR, SERVER_ERROR_HEADER,
+                                  ServerErrorMiddleware, count_locked)
+
+        request = rf.post('/api/v1/titles/1/reviews/')
+
+        def get_response(request):
+            middleware.process_exception(
+                request, OperationalError('database is locked')
+            )
+            return HttpResponseServerError()
+
+        middleware = ServerErrorMiddleware(get_response)
+        response = middleware(request)
+        assert response[SERVER_ERROR_HEADER] == LOCKED_ERROR, (
+            'Проверьте, что сервер `load_test` сообщает исключение ответа '
+            '5xx в заголовке.'
+        )
+        log = '\n'.join((
+            'Internal Server Error: /api/v1/titles/1/reviews/',
+            'sqlite3.OperationalError: database is locked',
+            'django.db.utils.OperationalError: database is locked',
+            '"POST /api/v1/titles/1/reviews/ HTTP/1.1" 500 145',
+        ))
+        assert count_locked(log) == 1, (
+            'Проверьте, что блокировки БД в журнале сервера считаются '
+            'по одной на исключение.'
+        )
+
+    def test_04_temporary_database(self, tmp_path):
+        output = tmp_path / 'load.json'
+        db_path = os.path.join(MANAGE_PATH, 'db.sqlite3')
+        emails_path = os.path.join(MANAGE_PATH, 'sent_emails')
+        before = [os.path.exists(path) for path in (db_path, emails_path)]
+        subprocess.run(
+            [
+                sys.executable, os.path.join(MANAGE_PATH, 'manage.py'),
+                'load_test', '--temp-db', '200', '--threads', '2',
+                '--duration', '1', '--output', str(output),
+            ],
+            check=True, capture_output=True, timeout=300,
+        )
+        report = json.loads(output.read_text(encoding='utf-8'))
+        assert report['auth-signup']['requests'] > 0
+        assert report['*']['locked_in_server_log'] >= 0, (
+            'Проверьте, что `load_test` считает блокировки БД по журналу '
+            'запущенного сервера.'
+        )
+        assert [
+            os.path.exists(path) for path in (db_path, emails_path)
+        ] == before, (
+            'Проверьте, что `load_test --temp-db` не создаёт БД проекта '
+            'и каталог писем.'
+        )
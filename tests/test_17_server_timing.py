@@ -0,0 +1,76 @@
+import json
+import logging
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_titles
+
+
+def parse_server_timing(header):
+    metrics = {}
+    for part in header.split(','):
+        name, *params = [item.strip() for item in part.split(';')]
+        metrics[name] = dict(param.split('=', 1) for param in params)
+    return metrics
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17ServerTiming:
+
+    @pytest.fixture
+    def metrics_on(self, settings):
+        settings.REQUEST_METRICS = True
+
+    def test_01_header_for_admin(self, client, admin_client, metrics_on):
+        create_titles(admin_client)
+        url = '/api/v1/titles/'
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.get(url)
+        assert response.has_header('Server-Timing'), (
+            'Проверьте, что ответ администратору содержит заголовок '
+            '`Server-Timing`.'
+        )
+        metrics = parse_server_timing(response['Server-Timing'])
+        assert set(metrics) == {'db', 'serialize', 'view', 'total'}
+        assert metrics['db']['desc'] == (
+            f'"{len(context.captured_queries)} queries"'
+        ), (
+            'Проверьте, что `Server-Timing` сообщает число SQL-запросов.'
+        )
+        assert float(metrics['serialize']['dur']) > 0
+        assert not client.get(url).has_header('Server-Timing'), (
+            'Проверьте, что анонимным пользователям заголовок '
+            '`Server-Timing` не отдаётся.'
+        )
+
+    def test_02_public_header_and_log(self, client, settings, caplog,
+                                      metrics_on):
+        settings.SERVER_TIMING_PUBLIC = True
+        with caplog.at_level(logging.INFO, logger='api.metrics'):
+            response = client.get('/api/v1/categories/')
+        assert response.has_header('Server-Timing'), (
+            'Проверьте, что при `SERVER_TIMING_PUBLIC = True` заголовок '
+            '`Server-Timing` отдаётся всем.'
+        )
+        record = json.loads(caplog.records[-1].getMessage())
+        assert record['view'] == 'api:categories-list'
+        assert record['status'] == 200
+        assert {'queries', 'db_ms', 'serialize_ms', 'view_ms', 'total_ms'} <= (
+            set(record)
+        ), (
+            'Проверьте, что счётчики запроса пишутся в лог `api.metrics` '
+            'строкой JSON.'
+        )
+
+    def test_03_off_by_default(self, admin_client, settings):
+        from api.instrumentation import record_queries
+
+        assert not admin_client.get('/api/v1/titles/').has_header(
+            'Server-Timing'
+        )
+        assert record_queries not in connection.execute_wrappers, (
+            'Проверьте, что при выключенном `REQUEST_METRICS` к выполнению '
+            'SQL-запросов не добавляется обёртка счётчиков.'
+        )
@@ -0,0 +1,94 @@
+import logging
+
+import pytest
+
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18NPlusOne:
+
+    def create_data(self, admin_client, admin, moderator, user,
+                    moderator_client, user_client):
+        return create_comments(admin_client, {
+            admin: admin_client,
+            moderator: moderator_client,
+            user: user_client,
+        })
+
+    def test_01_fingerprint(self):
+        from api.instrumentation import fingerprint_sql
+
+        assert fingerprint_sql(
+            "SELECT * FROM t WHERE id = 15 AND name = 'it''s'"
+        ) == fingerprint_sql(
+            "SELECT  *  FROM t WHERE id = %s AND name = 'x'"
+        ) == 'SELECT * FROM t WHERE id = ? AND name = ?', (
+            'Проверьте, что форма запроса не зависит от литералов, '
+            'параметров и пробелов.'
+        )
+        assert fingerprint_sql(
+            'SELECT * FROM t WHERE id IN (%s, %s, %s)'
+        ) == fingerprint_sql('SELECT * FROM t WHERE id IN (1)'), (
+            'Проверьте, что списки IN разной длины дают одну форму запроса.'
+        )
+
+    def test_02_detects_serializer_field(self, admin_client, admin,
+                                         moderator, user, moderator_client,
+                                         user_client):
+        from api.instrumentation import NPlusOneError, assert_no_n_plus_one
+        from api.serializers import ReviewSerializer
+        from reviews.models import Review
+
+        self.create_data(admin_client, admin, moderator, user,
+                         moderator_client, user_client)
+        with pytest.raises(NPlusOneError) as error:
+            with assert_no_n_plus_one():
+                ReviewSerializer(Review.objects.all(), many=True).data
+        assert 'ReviewSerializer.author' in str(error.value), (
+            'Проверьте, что N+1 указывает поле сериализатора, '
+            'при представлении которого выполнены повторные запросы.'
+        )
+        assert 'test_18_nplusone.py' in str(error.value), (
+            'Проверьте, что N+1 указывает строку кода проекта, '
+            'из которой выполнены повторные запросы.'
+        )
+        with assert_no_n_plus_one():
+            ReviewSerializer(
+                Review.objects.select_related('author'), many=True
+            ).data
+
+    def test_03_api_lists_pass_in_raise_mode(self, client, admin_client,
+                                             admin, moderator, user,
+                                             moderator_client, user_client,
+                                             settings):
+        settings.NPLUSONE_DETECTION = 'raise'
+        _, reviews, titles = self.create_data(
+            admin_client, admin, moderator, user,
+            moderator_client, user_client,
+        )
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        for url in (
+            '/api/v1/titles/',
+            reviews_url,
+            f'{reviews_url}{reviews[0]["id"]}/comments/',
+            '/api/v1/users/',
+        ):
+            assert admin_client.get(url).status_code == 200, (
+                f'Проверьте, что GET-запрос к `{url}` не выполняет '
+                'однотипный запрос к БД на каждый объект списка.'
+            )
+
+    def test_04_log_mode(self, admin_client, settings, caplog):
+        settings.NPLUSONE_DETECTION = 'log'
+        settings.NPLUSONE_THRESHOLD = 1
+        with caplog.at_level(logging.WARNING, logger='api.nplusone'):
+            response = admin_client.get('/api/v1/categories/')
+        assert response.status_code == 200
+        assert any(
+            'GET /api/v1/categories/' in record.getMessage()
+            for record in caplog.records
+        ), (
+            'Проверьте, что в режиме `log` повторные запросы пишутся '
+            'в лог `api.nplusone`, а запрос выполняется.'
+        )
@@ -0,0 +1,328 @@
+import itertools
+from collections import namedtuple
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+SMALL = 2
+LARGE = 15
+
+Case = namedtuple(
+    'Case', ('name', 'method', 'prepare', 'status', 'budget', 'admin')
+)
+Case.__new__.__defaults__ = (True,)
+
+counter = itertools.count()
+
+
+def unique(prefix):
+    return f'{prefix}{next(counter)}'
+
+
+def new_user(django_user_model):
+    name = unique('budget_user')
+    return django_user_model.objects.create_user(
+        username=name, email=f'{name}@yamdb.fake'
+    )
+
+
+def new_title(state, size, with_reviews=False):
+    """Произведение со всеми жанрами и, по запросу, size отзывами."""
+    from reviews.models import Review, Title
+
+    title = Title.objects.create(
+        name=unique('Произведение '), year=2000, category=state['category']
+    )
+    title.genre.set(state['genres'])
+    if with_reviews:
+        Review.objects.bulk_create(
+            Review(title=title, author=author, text='text', score=5)
+            for author in state['authors'][:size]
+        )
+    return title
+
+
+def new_review(state, size):
+    """Отзыв с size комментариями на новом произведении."""
+    from reviews.models import Comment, Review
+
+    review = Review.objects.create(
+        title=new_title(state, size), author=state['authors'][0],
+        text='text', score=5,
+    )
+    Comment.objects.bulk_create(
+        Comment(review=review, author=author, text='text')
+        for author in state['authors'][:size]
+    )
+    return review
+
+
+def new_comment(state):
+    return state['review'].comments.create(
+        author=state['authors'][0], text='text'
+    )
+
+
+def reviews_url(state):
+    return f'/api/v1/titles/{state["title"].id}/reviews/'
+
+
+def comments_url(state):
+    return f'{reviews_url(state)}{state["review"].id}/comments/'
+
+
+def review_url(review):
+    return f'/api/v1/titles/{review.title_id}/reviews/{review.id}/'
+
+
+def new_category_with_titles(state, size):
+    from reviews.models import Category, Title
+
+    slug = unique('budget-category-')
+    category = Category.objects.create(name=slug, slug=slug)
+    Title.objects.filter(
+        id__in=[new_title(state, size).id for _ in range(size)]
+    ).update(category=category)
+    return slug
+
+
+def new_genre_with_titles(state, size):
+    from reviews.models import Genre
+
+    slug = unique('budget-genre-')
+    genre = Genre.objects.create(name=slug, slug=slug)
+    for _ in range(size):
+        new_title(state, size).genre.add(genre)
+    return slug
+
+
+def new_author_with_reviews(state, size):
+    """Пользователь с отзывами на size произведений."""
+    from reviews.models import Review
+
+    user = new_user(state['user_model'])
+    for _ in range(size):
+        Review.objects.create(
+            title=new_title(state, size), author=user, text='text', score=5
+        )
+    return user.username
+
+
+def signup_data():
+    name = unique('budget_signup')
+    return {'username': name, 'email': f'{name}@yamdb.fake'}
+
+
+def title_data(state):
+    return {
+        'name': unique('Произведение '),
+        'year': 2000,
+        'category': state['category'].slug,
+        'genre': [genre.slug for genre in state['genres']],
+    }
+
+
+CASES = (
+    Case('categories-list', 'get',
+         lambda state, size: ('/api/v1/categories/', None), 200, 2, False),
+    Case('categories-create', 'post',
+         lambda state, size: ('/api/v1/categories/', {
+             'name': 'Новая', 'slug': unique('new-category-'),
+         }), 201, 4),
+    Case('categories-destroy', 'delete',
+         lambda state, size: (
+             f'/api/v1/categories/{new_category_with_titles(state, size)}/',
+             None,
+         ), 204, 6),
+    Case('genres-list', 'get',
+         lambda state, size: ('/api/v1/genres/', None), 200, 2, False),
+    Case('genres-create', 'post',
+         lambda state, size: ('/api/v1/genres/', {
+             'name': 'Новый', 'slug': unique('new-genre-'),
+         }), 201, 4),
+    Case('genres-destroy', 'delete',
+         lambda state, size: (
+             f'/api/v1/genres/{new_genre_with_titles(state, size)}/', None,
+         ), 204, 5),
+    Case('titles-list', 'get',
+         lambda state, size: ('/api/v1/titles/', None), 200, 3, False),
+    Case('titles-detail', 'get',
+         lambda state, size: (f'/api/v1/titles/{state["title"].id}/', None),
+         200, 2, False),
+    Case('titles-create', 'post',
+         lambda state, size: ('/api/v1/titles/', title_data(state)),
+         201, 10),
+    Case('titles-partial-update', 'patch',
+         lambda state, size: (
+             f'/api/v1/titles/{state["title"].id}/', title_data(state),
+         ), 200, 11),
+    Case('titles-destroy', 'delete',
+         lambda state, size: (
+             f'/api/v1/titles/{new_title(state, size, True).id}/', None,
+         ), 204, 10),
+    Case('reviews-list', 'get',
+         lambda state, size: (reviews_url(state), None), 200, 3, False),
+    Case('reviews-detail', 'get',
+         lambda state, size: (review_url(state['review']), None),
+         200, 2, False),
+    Case('reviews-create', 'post',
+         lambda state, size: (
+             f'/api/v1/titles/{new_title(state, size, True).id}/reviews/',
+             {'text': 'Новый отзыв', 'score': 7},
+         ), 201, 6),
+    Case('reviews-partial-update', 'patch',
+         lambda state, size: (
+             review_url(state['review']), {'text': unique('Текст ')},
+         ), 200, 6),
+    Case('reviews-destroy', 'delete',
+         lambda state, size: (review_url(new_review(state, size)), None),
+         204, 7),
+    Case('comments-list', 'get',
+         lambda state, size: (comments_url(state), None), 200, 3, False),
+    Case('comments-detail', 'get',
+         lambda state, size: (
+             f'{comments_url(state)}{state["comment"].id}/', None,
+         ), 200, 2, False),
+    Case('comments-create', 'post',
+         lambda state, size: (comments_url(state), {'text': 'Новый'}),
+         201, 3),
+    Case('comments-partial-update', 'patch',
+         lambda state, size: (
+             f'{comments_url(state)}{state["comment"].id}/',
+             {'text': unique('Текст ')},
+         ), 200, 4),
+    Case('comments-destroy', 'delete',
+         lambda state, size: (
+             f'{comments_url(state)}{new_comment(state).id}/', None,
+         ), 204, 5),
+    Case('users-list', 'get',
+         lambda state, size: ('/api/v1/users/', None), 200, 3),
+    Case('users-create', 'post',
+         lambda state, size: ('/api/v1/users/', signup_data()), 201, 4),
+    Case('users-detail', 'get',
+         lambda state, size: (
+             f'/api/v1/users/{state["authors"][0].username}/', None,
+         ), 200, 2),
+    Case('users-partial-update', 'patch',
+         lambda state, size: (
+             f'/api/v1/users/{state["authors"][0].username}/',
+             {'bio': unique('bio ')},
+         ), 200, 4),
+    Case('users-destroy', 'delete',
+         lambda state, size: (
+             f'/api/v1/users/{new_author_with_reviews(state, size)}/', None,
+         ), 204, 17),
+    Case('users-me', 'get',
+         lambda state, size: ('/api/v1/users/me/', None), 200, 1),
+    Case('users-me-partial-update', 'patch',
+         lambda state, size: ('/api/v1/users/me/', {'bio': unique('bio ')}),
+         200, 3),
+    Case('auth-signup', 'post',
+         lambda state, size: ('/api/v1/auth/signup/', signup_data()),
+         200, 6, False),
+    Case('auth-token', 'post',
+         lambda state, size: ('/api/v1/auth/token/', {
+             'username': state['authors'][0].username,
+             'confirmation_code': str(
+                 state['user_model'].objects.get(
+                     pk=state['authors'][0].pk
+                 ).confirmation_code
+             ),
+         }), 200, 1, False),
+    Case('cache-stats', 'get',
+         lambda state, size: ('/api/v1/cache-stats/', None), 200, 1),
+    Case('statement-stats', 'get',
+         lambda state, size: ('/api/v1/statement-stats/', None), 200, 1),
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19QueryBudget:
+
+    def populate(self, state, size):
+        """
+        Доводит объём данных до size: произведений, авторов,
+        отзывов на произведение state['title'] и комментариев
+        к отзыву state['review'].
+        """
+        from reviews.models import Comment, Review, Title
+
+        while len(state['authors']) < size:
+            state['authors'].append(new_user(state['user_model']))
+        for _ in range(size - Title.objects.count()):
+            new_title(state, size)
+        Review.objects.bulk_create(
+            Review(title=state['title'], author=author, text='text', score=5)
+            for author in state['authors'][
+                state['title'].reviews.count():size
+            ]
+        )
+        Comment.objects.bulk_create(
+            Comment(review=state['review'], author=author, text='text')
+            for author in state['authors'][
+                state['review'].comments.count():size
+            ]
+        )
+
+    def create_state(self, django_user_model):
+        from reviews.models import Category, Comment, Genre, Review
+
+        state = {
+            'user_model': django_user_model,
+            'category': Category.objects.create(name='Фильм', slug='movie'),
+            'genres': [
+                Genre.objects.create(name=slug, slug=slug)
+                for slug in ('drama', 'comedy', 'western')
+            ],
+            'authors': [new_user(django_user_model)],
+        }
+        state['title'] = new_title(state, SMALL)
+        state['review'] = Review.objects.create(
+            title=state['title'], author=state['authors'][0],
+            text='text', score=5,
+        )
+        state['comment'] = Comment.objects.create(
+            review=state['review'], author=state['authors'][0], text='text',
+        )
+        return state
+
+    def count_queries(self, case, client, state, size):
+        from reviews.ratings import rebuild_ratings
+
+        url, data = case.prepare(state, size)
+        rebuild_ratings()
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            if data is None:
+                response = getattr(client, case.method)(url)
+            else:
+                response = getattr(client, case.method)(
+                    url, data, format='json'
+                )
+        assert response.status_code == case.status, (
+            f'Проверьте, что {case.method.upper()}-запрос к `{url}` '
+            f'возвращает ответ со статусом {case.status}.'
+        )
+        return len(context.captured_queries)
+
+    @pytest.mark.parametrize('case', CASES, ids=[case.name for case in CASES])
+    def test_query_budget(self, case, client, admin_client,
+                          django_user_model):
+        state = self.create_state(django_user_model)
+        client = admin_client if case.admin else client
+        counts = []
+        for size in (SMALL, LARGE):
+            self.populate(state, size)
+            counts.append(self.count_queries(case, client, state, size))
+        small, large = counts
+        assert small == large, (
+            f'Проверьте, что запрос {case.name} выполняет постоянное '
+            'количество запросов к БД вне зависимости от объёма данных: '
+            f'при {SMALL} объектах {small}, при {LARGE} — {large}.'
+        )
+        assert large <= case.budget, (
+            f'Проверьте, что запрос {case.name} выполняет не больше '
+            f'{case.budget} запросов к БД, сейчас {large}.'
+        )
@@ -0,0 +1,140 @@
+import json
+import logging
+from contextlib import contextmanager
+
+import pytest
+from django.db import connection
+
+from tests.utils import create_titles
+
+
+@contextmanager
+def slow_query_log(settings, threshold):
+    from api.instrumentation import install_slow_query_log, log_slow_queries
+
+    settings.SLOW_QUERY_THRESHOLD_MS = threshold
+    install_slow_query_log(sender=None, connection=connection)
+    try:
+        yield
+    finally:
+        connection.execute_wrappers.remove(log_slow_queries)
+
+
+def slow_queries(caplog):
+    return [
+        json.loads(record.getMessage()) for record in caplog.records
+        if record.name == 'api.slow_queries'
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20SlowQueries:
+
+    @pytest.fixture(autouse=True)
+    def log_file(self, monkeypatch, tmp_path):
+        # Журнал тестов пишется во временный каталог, а не в SLOW_QUERY_LOG.
+        path = tmp_path / 'slow_queries.log'
+        handlers = [
+            handler
+            for handler in logging.getLogger('api.slow_queries').handlers
+            if isinstance(handler, logging.FileHandler)
+        ]
+        for handler in handlers:
+            handler.close()
+            monkeypatch.setattr(handler, 'baseFilename', str(path))
+        yield path
+        for handler in handlers:
+            handler.close()
+
+    def test_01_logs_plan_and_view(self, client, admin_client, settings,
+                                   caplog, log_file):
+        create_titles(admin_client)
+        settings.SLOW_QUERY_LOG_PARAMS = True
+        with slow_query_log(settings, 0), caplog.at_level(
+            logging.WARNING, logger='api.slow_queries'
+        ):
+            response = client.get('/api/v1/titles/?genre=drama')
+        assert response.status_code == 200
+        records = [
+            record for record in slow_queries(caplog)
+            if 'FROM "reviews_title"' in record['sql']
+        ]
+        assert records, (
+            'Проверьте, что при `SLOW_QUERY_THRESHOLD_MS` запросы дольше '
+            'порога пишутся в лог `api.slow_queries`.'
+        )
+        record = records[0]
+        assert record['view'] == 'api:titles-list', (
+            'Проверьте, что в журнал медленных запросов пишется имя view.'
+        )
+        assert record['params'] and record['param_count'] == len(
+            record['params']
+        ), (
+            'Проверьте, что при `SLOW_QUERY_LOG_PARAMS` в журнал медленных '
+            'запросов пишутся параметры.'
+        )
+        assert record['plan'] and any(
+            step.startswith(('SCAN', 'SEARCH')) for step in record['plan']
+        ), (
+            'Проверьте, что в журнал медленных запросов пишется '
+            'результат `EXPLAIN QUERY PLAN`.'
+        )
+        assert 'api:titles-list' in log_file.read_text(encoding='utf-8'), (
+            'Проверьте, что журнал медленных запросов пишется в файл '
+            '`SLOW_QUERY_LOG`.'
+        )
+
+    def test_02_threshold(self, client, settings, caplog):
+        with slow_query_log(settings, 10 ** 6), caplog.at_level(
+            logging.WARNING, logger='api.slow_queries'
+        ):
+            client.get('/api/v1/titles/')
+        assert not slow_queries(caplog), (
+            'Проверьте, что запросы быстрее `SLOW_QUERY_THRESHOLD_MS` '
+            'не пишутся в журнал медленных запросов.'
+        )
+
+    def test_03_params_masked(self, client, settings, caplog):
+        from api.instrumentation import fingerprint_sql
+
+        with slow_query_log(settings, 0), caplog.at_level(
+            logging.WARNING, logger='api.slow_queries'
+        ):
+            client.post('/api/v1/auth/signup/', {
+                'username': 'secret_user', 'email': 'secret@yamdb.fake',
+            })
+        records = slow_queries(caplog)
+        assert records
+        assert not any(
+            'secret' in json.dumps(record, ensure_ascii=False)
+            for record in records
+        ), (
+            'Проверьте, что без `SLOW_QUERY_LOG_PARAMS` значения '
+            'параметров не попадают в журнал медленных запросов.'
+        )
+        assert all(
+            record['params'] is None
+            and record['sql'] == fingerprint_sql(record['sql'])
+            for record in records
+        )
+
+    def test_04_executemany(self, settings, caplog):
+        from reviews.models import Genre
+
+        rows = [(f'Жанр {number}', f'many-{number}') for number in range(3)]
+        with slow_query_log(settings, 0), caplog.at_level(
+            logging.WARNING, logger='api.slow_queries'
+        ):
+            with connection.cursor() as cursor:
+                cursor.executemany(
+                    'INSERT INTO reviews_genre (name, slug) VALUES (%s, %s)',
+                    iter(rows),
+                )
+        records = [
+            record for record in slow_queries(caplog) if record['many']
+        ]
+        assert records and records[0]['param_count'] == len(rows), (
+            'Проверьте, что запросы executemany пишутся в журнал '
+            'медленных запросов с числом наборов параметров.'
+        )
+        assert Genre.objects.filter(slug__startswith='many-').count() == 3
@@ -0,0 +1,134 @@
+import json
+import subprocess
+import sys
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_titles
+
+TITLES_SQL = 'FROM "reviews_title"'
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21StatementStats:
+
+    @pytest.fixture(autouse=True)
+    def stats_dir(self, settings, tmp_path):
+        from api.statements import statement_stats
+
+        settings.STATEMENT_STATS = True
+        settings.STATEMENT_STATS_DIR = str(tmp_path)
+        statement_stats.reset()
+        yield tmp_path
+        # Статистика тестов не должна попасть в каталог по умолчанию.
+        statement_stats.reset()
+
+    def test_01_endpoint(self, client, admin_client, user_client):
+        create_titles(admin_client)
+        for year in (2000, 2001, 2002):
+            client.get(f'/api/v1/titles/?year={year}')
+        url = '/api/v1/statement-stats/'
+        assert client.get(url).status_code == 401
+        assert user_client.get(url).status_code == 403, (
+            f'Проверьте, что `{url}` доступен только администратору.'
+        )
+        assert admin_client.get(f'{url}?order=name').status_code == 400
+        response = admin_client.get(f'{url}?order=calls&limit=100')
+        assert response.status_code == 200
+        statements = response.json()
+        assert [item['calls'] for item in statements] == sorted(
+            (item['calls'] for item in statements), reverse=True
+        ), 'Проверьте, что статистика отсортирована по параметру `order`.'
+        titles = [
+            item for item in statements
+            if item['fingerprint'].startswith('SELECT')
+            and TITLES_SQL in item['fingerprint']
+            and '"year" = ?' in item['fingerprint']
+        ]
+        assert titles and titles[0]['calls'] >= 3, (
+            'Проверьте, что запросы, отличающиеся только значениями, '
+            'учитываются как одна форма запроса.'
+        )
+        item = titles[0]
+        assert item['max_ms'] <= item['total_ms']
+        assert item['mean_ms'] == pytest.approx(
+            item['total_ms'] / item['calls'], abs=0.01
+        )
+
+    def test_02_command_merges_saved(self, admin_client, stats_dir):
+        from api.statements import collect_statements
+
+        create_titles(admin_client)
+        fingerprint = 'SELECT 1 FROM "saved_elsewhere"'
+        (stats_dir / '1.json').write_text(
+            json.dumps({fingerprint: [5, 0.5, 0.2]}), encoding='utf-8'
+        )
+        assert collect_statements(str(stats_dir))[fingerprint] == [
+            5, 0.5, 0.2
+        ]
+        out = StringIO()
+        call_command(
+            'statement_stats', '--json', '--order', 'total', '--limit', '1',
+            '--reset', stdout=out,
+        )
+        statements = json.loads(out.getvalue().split('\nСтатистика')[0])
+        assert statements == [{
+            'fingerprint': fingerprint, 'calls': 5, 'total_ms': 500.0,
+            'mean_ms': 100.0, 'max_ms': 200.0,
+        }], (
+            'Проверьте, что команда `statement_stats` объединяет '
+            'статистику, сохранённую другими процессами.'
+        )
+        assert not list(stats_dir.glob('*.json')), (
+            'Проверьте, что `statement_stats --reset` удаляет сохранённую '
+            'статистику.'
+        )
+
+    def test_03_skips_finished_processes(self, stats_dir):
+        from api.statements import collect_statements
+
+        process = subprocess.Popen([sys.executable, '-c', 'pass'])
+        process.wait()
+        fingerprint = 'SELECT 1 FROM "finished_process"'
+        (stats_dir / f'{process.pid}.json').write_text(
+            json.dumps({fingerprint: [1, 0.1, 0.1]}), encoding='utf-8'
+        )
+        assert fingerprint not in collect_statements(str(stats_dir)), (
+            'Проверьте, что статистика завершившихся процессов '
+            'не учитывается.'
+        )
+        assert not (stats_dir / f'{process.pid}.json').exists(), (
+            'Проверьте, что файлы статистики завершившихся процессов '
+            'удаляются.'
+        )
+
+    def test_04_reset_clears_running_processes(self, stats_dir):
+        from api.statements import statement_stats
+
+        fingerprint = 'SELECT 1 FROM "before_reset"'
+        statement_stats.record(fingerprint, 0.1)
+        statement_stats.save(str(stats_dir))
+        call_command('statement_stats', '--reset', stdout=StringIO())
+        statement_stats.record('SELECT 1 FROM "after_reset"', 0.1)
+        statement_stats.save(str(stats_dir))
+        saved = json.loads(
+            next(stats_dir.glob('*.json')).read_text(encoding='utf-8')
+        )
+        assert fingerprint not in saved, (
+            'Проверьте, что после `statement_stats --reset` работающий '
+            'процесс очищает свою статистику, а не сохраняет её заново.'
+        )
+
+    def test_05_disabled(self, settings, client):
+        from django.db import connection
+
+        from api.statements import record_statements
+
+        settings.STATEMENT_STATS = False
+        client.get('/api/v1/titles/')
+        assert record_statements not in connection.execute_wrappers, (
+            'Проверьте, что при выключенном `STATEMENT_STATS` к выполнению '
+            'SQL-запросов не добавляется обёртка статистики.'
+        )
@@ -0,0 +1,68 @@
+import os
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Count
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22GenerateDataset:
+
+    def test_01_generate_dataset(self, client, tmp_path):
+        from reviews.models import Comment, Review, Title
+
+        options = (
+            '--users', '50', '--titles', '40', '--genres', '5',
+            '--categories', '3', '--reviews', '400',
+            '--comments-per-review', '1', '--seed', '7',
+        )
+        call_command(
+            'generate_dataset', *options, '--output-dir', tmp_path / 'a'
+        )
+        call_command(
+            'generate_dataset', *options, '--output-dir', tmp_path / 'b'
+        )
+        for name in os.listdir(tmp_path / 'a'):
+            assert (tmp_path / 'a' / name).read_bytes() == (
+                tmp_path / 'b' / name
+            ).read_bytes(), (
+                'Проверьте, что `generate_dataset` с одинаковым `--seed` '
+                'создаёт одинаковые файлы.'
+            )
+        call_command(
+            'read_csv_files', '--data-dir', tmp_path / 'a',
+            '--dry-run', '--report', tmp_path / 'report.csv',
+        )
+        call_command('read_csv_files', '--data-dir', tmp_path / 'a')
+        imported = (
+            Title.objects.count(),
+            Review.objects.count(),
+            Comment.objects.count(),
+            list(Title.objects.order_by('id').values_list(
+                'score_sum', 'reviews_count'
+            )),
+        )
+        counts = sorted(
+            Review.objects.order_by().values('title_id').annotate(
+                count=Count('id')
+            ).values_list('count', flat=True)
+        )
+        assert counts[-1] >= 4 * counts[len(counts) // 2], (
+            'Проверьте, что `generate_dataset` распределяет отзывы '
+            'по произведениям неравномерно.'
+        )
+
+        call_command('flush', '--no-input')
+        call_command('generate_dataset', *options)
+        assert (
+            Title.objects.count(),
+            Review.objects.count(),
+            Comment.objects.count(),
+            list(Title.objects.order_by('id').values_list(
+                'score_sum', 'reviews_count'
+            )),
+        ) == imported, (
+            'Проверьте, что `generate_dataset` записывает в БД тот же '
+            'набор, что и в файлы, и пересчитывает рейтинг.'
+        )
+        assert client.get('/api/v1/titles/').status_code == 200